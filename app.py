@@ -1,22 +1,55 @@
-from flask import Flask, request, jsonify, render_template_string
+from flask import Flask, Response, request, jsonify, g, stream_with_context, abort
+import click
 import sqlite3
 import json
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import csv
 import io
 import os
-
-app = Flask(__name__)
-DB_PATH = 'sales.db'
+import threading
+import base64
+import re
+import zipfile
+import hashlib
+import zlib
+import gzip
+import shutil
+import tempfile
+from collections import Counter
+from xml.etree.ElementTree import iterparse, ParseError
+from xml.sax.saxutils import escape as xml_escape
+
+# Optional: brotli is offered to clients only when the package is installed
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Pages load static/ only through the fingerprinted /assets/ route below
+app = Flask(__name__, static_folder=None)
+DB_PATH = os.environ.get('SALES_DB_PATH', 'sales.db')
 MASTER_DATA_PATH = 'master_data.json'
 
+# SQLite tuning (overridable through the environment)
+app.config.update(
+    SQLITE_BUSY_TIMEOUT=int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000)),
+    SQLITE_SYNCHRONOUS=os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    SQLITE_MMAP_SIZE=int(os.environ.get('SQLITE_MMAP_SIZE', 64 * 1024 * 1024)),
+    SQLITE_CACHE_SIZE=int(os.environ.get('SQLITE_CACHE_SIZE', -16000)),
+    COMPRESS_MIN_SIZE=int(os.environ.get('COMPRESS_MIN_SIZE', 1024)),
+    COMPRESS_GZIP_LEVEL=int(os.environ.get('COMPRESS_GZIP_LEVEL', 6)),
+    COMPRESS_BROTLI_QUALITY=int(os.environ.get('COMPRESS_BROTLI_QUALITY', 4)),
+)
+
 # Card types list
 CARD_TYPES = ['SBI', 'ICICI', 'HDFC', 'KOTAK', 'AXIS', 'IDFC', 'INDUSIND', 'RBL', 'YES', 'BOB', 'FEDERAL']
+MASTER_LISTS = ['machines', 'vendors', 'models']
 
-# Load Master Data
-def load_master_data():
-    if os.path.exists(MASTER_DATA_PATH):
-        with open(MASTER_DATA_PATH, 'r', encoding='utf-8') as f:
+# Master data lives in SQLite (inventory and master_names); master_data.json
+# is only an import/export format
+def load_master_data(path=MASTER_DATA_PATH):
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
             return json.load(f)
     return {
         "cards": [],
@@ -25,16 +58,303 @@ def load_master_data():
         "models": []
     }
 
-# Save Master Data
-def save_master_data(data):
-    with open(MASTER_DATA_PATH, 'w', encoding='utf-8') as f:
+# Write to a temporary file and rename it over the target, so readers never
+# see a half-written file
+def save_master_data(data, path=MASTER_DATA_PATH):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
         json.dump(data, f, indent=2)
-
-master_data = load_master_data()
+    os.replace(tmp_path, path)
+
+# Connection pool: one long-lived connection per thread and per worker process,
+# handed out for the duration of an app context
+_pool = threading.local()
+
+def connect_db():
+    cfg = app.config
+    conn = sqlite3.connect(DB_PATH, timeout=cfg['SQLITE_BUSY_TIMEOUT'] / 1000)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute(f"PRAGMA busy_timeout={int(cfg['SQLITE_BUSY_TIMEOUT'])}")
+    conn.execute(f"PRAGMA synchronous={cfg['SQLITE_SYNCHRONOUS']}")
+    conn.execute(f"PRAGMA mmap_size={int(cfg['SQLITE_MMAP_SIZE'])}")
+    conn.execute(f"PRAGMA cache_size={int(cfg['SQLITE_CACHE_SIZE'])}")
+    return conn
+
+def get_db():
+    if 'db' not in g:
+        # Connections must not cross a fork (e.g. gunicorn --preload)
+        if getattr(_pool, 'pid', None) != os.getpid():
+            _pool.conn = connect_db()
+            _pool.pid = os.getpid()
+        g.db = _pool.conn
+    return g.db
+
+@app.teardown_appcontext
+def release_db(exc):
+    conn = g.pop('db', None)
+    # Keep the connection open for reuse, but never leak a half-done transaction
+    if conn is not None and conn.in_transaction:
+        conn.rollback()
+
+SEARCH_COLUMNS = ['cardNumber', 'cardType', 'machine', 'vendor', 'model', 'type']
+
+# Trigram full-text index over the searchable sales columns, kept in sync by
+# triggers. Needs SQLite 3.34+; older builds fall back to LIKE scans.
+# sales has no INTEGER PRIMARY KEY, so run the 'rebuild' command after a VACUUM.
+def create_sales_search(c):
+    cols = ', '.join(SEARCH_COLUMNS)
+    new_cols = ', '.join('new.' + col for col in SEARCH_COLUMNS)
+    old_cols = ', '.join('old.' + col for col in SEARCH_COLUMNS)
+    try:
+        c.execute(f"CREATE VIRTUAL TABLE sales_fts USING fts5({cols}, content='sales', tokenize='trigram')")
+    except sqlite3.OperationalError:
+        return
+    create_insert_trigger(c, 'sales_fts_insert')
+    c.execute(f'''CREATE TRIGGER sales_fts_delete AFTER DELETE ON sales BEGIN
+        INSERT INTO sales_fts (sales_fts, rowid, {cols}) VALUES ('delete', old.rowid, {old_cols});
+    END''')
+    c.execute(f'''CREATE TRIGGER sales_fts_update AFTER UPDATE ON sales BEGIN
+        INSERT INTO sales_fts (sales_fts, rowid, {cols}) VALUES ('delete', old.rowid, {old_cols});
+        INSERT INTO sales_fts (rowid, {cols}) VALUES (new.rowid, {new_cols});
+    END''')
+    c.execute("INSERT INTO sales_fts (sales_fts) VALUES ('rebuild')")
+
+def fts_insert_sql(ref, rows=''):
+    cols = ', '.join(SEARCH_COLUMNS)
+    ref_cols = ', '.join(f'{ref}.{col}' for col in SEARCH_COLUMNS)
+    return f'INSERT INTO sales_fts (rowid, {cols}) SELECT {ref}.rowid, {ref_cols} {rows}'.rstrip() + ';'
+
+# Daily rollup of sales per (day, cardType, vendor, model, machine), maintained
+# by triggers in the same transaction as every sales write
+ROLLUP_DIMENSIONS = ['cardType', 'vendor', 'model', 'machine']
+
+def rollup_key_sql(ref):
+    keys = [f"COALESCE(substr({ref}.dateTime, 1, 10), '')"]
+    keys += [f"COALESCE({ref}.{col}, '')" for col in ROLLUP_DIMENSIONS]
+    return keys
+
+def rollup_apply_sql(ref, sign):
+    keys = rollup_key_sql(ref)
+    match = ' AND '.join(f'{col} = {key}' for col, key in zip(['day'] + ROLLUP_DIMENSIONS, keys))
+    statements = []
+    if sign > 0:
+        statements.append(f"INSERT OR IGNORE INTO sales_daily VALUES ({', '.join(keys)}, 0, 0);")
+    op = '+' if sign > 0 else '-'
+    statements.append(f'UPDATE sales_daily SET count = count {op} 1, '
+                      f'amount = amount {op} COALESCE({ref}.amount, 0) WHERE {match};')
+    if sign < 0:
+        statements.append(f'DELETE FROM sales_daily WHERE {match} AND count <= 0;')
+    return '\n'.join(statements)
+
+# rollup_apply_sql(ref, 1) for many sales rows at once
+def rollup_add_sql(rows):
+    return f'''INSERT INTO sales_daily
+        SELECT {', '.join(rollup_key_sql('sales'))}, COUNT(*), COALESCE(SUM(sales.amount), 0)
+        {rows} GROUP BY 1, 2, 3, 4, 5
+        ON CONFLICT (day, cardType, vendor, model, machine)
+        DO UPDATE SET count = count + excluded.count, amount = amount + excluded.amount;'''
+
+def rebuild_rollups(c):
+    c.execute('DELETE FROM sales_daily')
+    c.execute(f'''INSERT INTO sales_daily
+        SELECT {', '.join(rollup_key_sql('sales'))}, COUNT(*), COALESCE(SUM(amount), 0)
+        FROM sales GROUP BY 1, 2, 3, 4, 5''')
+
+def create_sales_rollups(c):
+    c.execute('''CREATE TABLE IF NOT EXISTS sales_daily (
+        day TEXT NOT NULL,
+        cardType TEXT NOT NULL,
+        vendor TEXT NOT NULL,
+        model TEXT NOT NULL,
+        machine TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        amount REAL NOT NULL,
+        PRIMARY KEY (day, cardType, vendor, model, machine)
+    ) WITHOUT ROWID''')
+    create_insert_trigger(c, 'sales_daily_insert')
+    c.execute(f'''CREATE TRIGGER sales_daily_delete AFTER DELETE ON sales BEGIN
+        {rollup_apply_sql('old', -1)}
+    END''')
+    c.execute(f'''CREATE TRIGGER sales_daily_update
+        AFTER UPDATE OF dateTime, cardType, vendor, model, machine, amount ON sales BEGIN
+        {rollup_apply_sql('old', -1)}
+        {rollup_apply_sql('new', 1)}
+    END''')
+    rebuild_rollups(c)
+
+# Every sales write also logs the card numbers it touched (old and new) as
+# ('cards', number, 'touch') change rows, so per-worker card indexes can
+# refresh just those cards whichever worker did the write
+def card_touch_sql(ref, rows=''):
+    where = f'{rows} AND' if rows else 'WHERE'
+    return (f"INSERT INTO changes (tbl, key, op) SELECT DISTINCT 'cards', {ref}.cardNumber, 'touch' "
+            f"{where} {ref}.cardNumber IS NOT NULL;")
+
+def create_card_touch_log(c):
+    create_insert_trigger(c, 'sales_cards_insert')
+    c.execute('''CREATE TRIGGER sales_cards_delete AFTER DELETE ON sales
+        WHEN old.cardNumber IS NOT NULL BEGIN
+        INSERT INTO changes (tbl, key, op) VALUES ('cards', old.cardNumber, 'touch');
+    END''')
+    c.execute('''CREATE TRIGGER sales_cards_update AFTER UPDATE OF cardNumber, model ON sales BEGIN
+        INSERT INTO changes (tbl, key, op) SELECT 'cards', old.cardNumber, 'touch'
+            WHERE old.cardNumber IS NOT NULL;
+        INSERT INTO changes (tbl, key, op) SELECT 'cards', new.cardNumber, 'touch'
+            WHERE new.cardNumber IS NOT NULL AND new.cardNumber IS NOT old.cardNumber;
+    END''')
+
+# The AFTER INSERT triggers on sales, as (per-row body, set-based statement
+# over BULK_ROWS), both built from the same helpers so bulk inserts
+# (insert_sales) maintain the same index, rollups and log as single rows
+BULK_ROWS = 'FROM sales WHERE sales.rowid > ?'
+SALES_INSERT_TRIGGERS = {
+    'sales_fts_insert': (fts_insert_sql('new'), fts_insert_sql('sales', BULK_ROWS)),
+    'sales_daily_insert': (rollup_apply_sql('new', 1), rollup_add_sql(BULK_ROWS)),
+    'sales_cards_insert': (card_touch_sql('new'), card_touch_sql('sales', BULK_ROWS)),
+}
+
+def create_insert_trigger(c, name):
+    c.execute(f'''CREATE TRIGGER {name} AFTER INSERT ON sales BEGIN
+        {SALES_INSERT_TRIGGERS[name][0]}
+    END''')
+
+# One-time copy of master_data.json: the machine/vendor/model lists, and the
+# cards too while inventory is still empty (a new database)
+def import_master_data_file(c):
+    data = load_master_data()
+    c.executemany('INSERT OR IGNORE INTO master_names (list, name) VALUES (?,?)',
+                  [(key, name) for key in MASTER_LISTS for name in data.get(key, [])])
+    c.execute('SELECT COUNT(*) FROM inventory')
+    if c.fetchone()[0] == 0 and data.get('cards'):
+        c.executemany('INSERT INTO inventory (number, type) VALUES (?,?)',
+                      [(card['number'], card['type']) for card in data['cards']])
+        c.execute('SELECT id FROM inventory')
+        record_changes(c, 'inventory', 'upsert', [row[0] for row in c.fetchall()])
+
+# Last change log seq per table, bumped by record_changes; unlike the log
+# itself it is never pruned, so versions only go up
+TABLE_VERSIONS_SQL = '''CREATE TABLE IF NOT EXISTS table_versions (
+    tbl TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+) WITHOUT ROWID'''
+
+# Schema migrations: (version, description, steps), applied once and in order.
+# A step is either a SQL statement or a callable taking the cursor.
+MIGRATIONS = [
+    (1, 'Indexes for card lookups and sales listing', [
+        'CREATE INDEX IF NOT EXISTS idx_inventory_number_type ON inventory (number, type)',
+        'CREATE INDEX IF NOT EXISTS idx_sales_datetime ON sales (dateTime)',
+        'CREATE INDEX IF NOT EXISTS idx_sales_card_number ON sales (cardNumber)',
+        'CREATE INDEX IF NOT EXISTS idx_sales_vendor_model ON sales (vendor, model)',
+        'CREATE INDEX IF NOT EXISTS idx_sales_model ON sales (model)',
+    ]),
+    (2, 'Keyset pagination index on sales (dateTime, id)', [
+        'CREATE INDEX IF NOT EXISTS idx_sales_datetime_id ON sales (dateTime, id)',
+        'DROP INDEX IF EXISTS idx_sales_datetime',
+    ]),
+    (3, 'Sales filter indexes and free-text search', [
+        'CREATE INDEX IF NOT EXISTS idx_sales_card_type ON sales (cardType)',
+        'CREATE INDEX IF NOT EXISTS idx_sales_machine ON sales (machine)',
+        create_sales_search,
+    ]),
+    (4, 'Change log for incremental sync', [
+        '''CREATE TABLE IF NOT EXISTS changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            tbl TEXT NOT NULL,
+            key TEXT NOT NULL,
+            op TEXT NOT NULL
+        )''',
+        TABLE_VERSIONS_SQL,
+    ]),
+    (5, 'Per-table change lookup for ETags', [
+        'CREATE INDEX IF NOT EXISTS idx_changes_tbl_seq ON changes (tbl, seq)',
+    ]),
+    (6, 'Daily sales rollups', [
+        create_sales_rollups,
+    ]),
+    (7, 'Card usage join index', [
+        'CREATE INDEX IF NOT EXISTS idx_sales_card_datetime ON sales (cardNumber, dateTime, id)',
+        'DROP INDEX IF EXISTS idx_sales_card_number',
+    ]),
+    (8, 'Card usage bitmaps: covering (model, cardNumber) index and card touch log', [
+        'CREATE INDEX IF NOT EXISTS idx_sales_model_card ON sales (model, cardNumber)',
+        'DROP INDEX IF EXISTS idx_sales_model',
+        create_card_touch_log,
+    ]),
+    (9, 'Sales import jobs', [
+        '''CREATE TABLE IF NOT EXISTS imports (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            format TEXT NOT NULL,
+            status TEXT NOT NULL,
+            rows INTEGER NOT NULL DEFAULT 0,
+            inserted INTEGER NOT NULL DEFAULT 0,
+            failed INTEGER NOT NULL DEFAULT 0,
+            errors TEXT NOT NULL DEFAULT '[]',
+            error TEXT,
+            started_at TEXT,
+            updated_at TEXT
+        )''',
+    ]),
+    (10, 'Master data lists in SQLite', [
+        '''CREATE TABLE IF NOT EXISTS master_names (
+            list TEXT NOT NULL,
+            name TEXT NOT NULL,
+            PRIMARY KEY (list, name)
+        ) WITHOUT ROWID''',
+        import_master_data_file,
+    ]),
+    (11, 'Per-table versions kept apart from the pruned change log', [
+        TABLE_VERSIONS_SQL,
+        # Start every table past any version handed out so far: a version read
+        # from the pruned log may since have gone back
+        '''INSERT OR REPLACE INTO table_versions (tbl, version)
+           SELECT name, (SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence WHERE name = 'changes')
+           FROM (SELECT 'sales' AS name UNION ALL SELECT 'inventory' UNION ALL SELECT 'master')''',
+    ]),
+    (12, 'Filtered keyset pagination indexes: (filter column, dateTime, id)', [
+        'CREATE INDEX IF NOT EXISTS idx_sales_card_type_datetime ON sales (cardType, dateTime, id)',
+        'CREATE INDEX IF NOT EXISTS idx_sales_vendor_datetime ON sales (vendor, dateTime, id)',
+        'CREATE INDEX IF NOT EXISTS idx_sales_machine_datetime ON sales (machine, dateTime, id)',
+        'CREATE INDEX IF NOT EXISTS idx_sales_model_datetime ON sales (model, dateTime, id)',
+        'DROP INDEX IF EXISTS idx_sales_card_type',
+        'DROP INDEX IF EXISTS idx_sales_machine',
+    ]),
+]
+
+def migrate(conn):
+    c = conn.cursor()
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TEXT
+        )
+    ''')
+    conn.commit()
+    
+    for version, description, steps in MIGRATIONS:
+        # IMMEDIATE takes the write lock, so concurrently starting workers
+        # wait here and then see the version as already applied
+        c.execute('BEGIN IMMEDIATE')
+        try:
+            c.execute('SELECT 1 FROM schema_version WHERE version = ?', (version,))
+            if c.fetchone() is None:
+                for step in steps:
+                    if callable(step):
+                        step(c)
+                    else:
+                        c.execute(step)
+                c.execute('INSERT INTO schema_version VALUES (?,?,?)',
+                          (version, description, datetime.now().isoformat(timespec='seconds')))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
 
 # Initialize Database
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_db()
     c = conn.cursor()
     
     c.execute('''
@@ -59,155 +379,807 @@ def init_db():
         )
     ''')
     
-    # Load cards from master data only if inventory is empty
-    c.execute('SELECT COUNT(*) FROM inventory')
-    if c.fetchone()[0] == 0 and master_data.get('cards'):
-        default_cards = [(card['number'], card['type']) for card in master_data['cards']]
-        c.executemany('INSERT INTO inventory (number, type) VALUES (?,?)', default_cards)
+    conn.commit()
+    migrate(conn)
+    
+    global search_enabled
+    c.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'sales_fts'")
+    search_enabled = c.fetchone()[0] > 0
+    card_index.refresh(c)
+
+search_enabled = False
+
+# Change log: every write to sales/inventory appends (table, key, op) rows in
+# the same transaction. Clients replay them via /api/sales/changes?since=.
+# Triggers add 'cards' rows for the card usage index and master data saves add
+# 'master' rows for the name lists; clients ignore both.
+CHANGES_RETENTION = 100000
+MAX_SYNC_CHANGES = 5000
+
+def record_changes(c, table, op, keys):
+    c.executemany('INSERT INTO changes (tbl, key, op) VALUES (?,?,?)',
+                  [(table, str(key), op) for key in keys])
+    if keys:
+        c.execute('INSERT OR REPLACE INTO table_versions (tbl, version) VALUES (?, (SELECT MAX(seq) FROM changes))',
+                  (table,))
+    c.execute('DELETE FROM changes WHERE seq <= (SELECT MAX(seq) FROM changes) - ?', (CHANGES_RETENTION,))
+
+def current_change_seq(c):
+    c.execute("SELECT seq FROM sqlite_sequence WHERE name = 'changes'")
+    row = c.fetchone()
+    return row[0] if row else 0
+
+# Version of a table for conditional GETs: the last change log entry touching
+# it, as kept in table_versions so pruning the log cannot take it back
+def table_version(c, table):
+    c.execute('SELECT version FROM table_versions WHERE tbl = ?', (table,))
+    row = c.fetchone()
+    return row[0] if row else 0
+
+# Per-worker map of card number -> inventory types for the card check run on
+# every keystroke. It is stamped with the inventory table version, so a master
+# data save in any worker makes the others reload it. PRAGMA data_version
+# only moves when another connection commits, so while nothing else has
+# written a lookup skips reading the version.
+class CardIndex:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.types = {}
+        self.hits = 0
+        self.misses = 0
+        self.seen = threading.local()
+
+    def refresh(self, c, force=False):
+        c.execute('PRAGMA data_version')
+        data_version = c.fetchone()[0]
+        seen = self.seen
+        if not force and getattr(seen, 'conn', None) is c.connection and seen.data_version == data_version:
+            self.hits += 1
+            return self
+        version = table_version(c, 'inventory')
+        if version == self.version:
+            self.hits += 1
+        else:
+            with self.lock:
+                if version != self.version:
+                    c.execute('SELECT DISTINCT number, type FROM inventory ORDER BY number, type')
+                    types = {}
+                    for number, card_type in c.fetchall():
+                        types.setdefault(number, []).append(card_type)
+                    self.types = types
+                    self.version = version
+            self.misses += 1
+        seen.conn, seen.data_version = c.connection, data_version
+        return self
+
+    def types_of(self, number):
+        return self.types.get(number, [])
+
+card_index = CardIndex()
+
+# Weak ETag for the current request; the query string is included because the
+# same data version renders differently per page, filter and format
+def request_etag(version):
+    return hashlib.sha1(f'{version}|{request.full_path}'.encode()).hexdigest()
+
+def not_modified(etag):
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag, weak=True)
+        return response
+    return None
+
+def with_etag(response, etag):
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+# Run `query` (containing a single {} for the placeholders) over values in
+# chunks that stay below SQLite's bound-parameter limit
+def select_in(c, query, values, chunk_size=500):
+    rows = []
+    for i in range(0, len(values), chunk_size):
+        chunk = values[i:i + chunk_size]
+        c.execute(query.format(','.join('?' * len(chunk))), chunk)
+        rows.extend(c.fetchall())
+    return rows
+
+# Response compression, negotiated through Accept-Encoding
+COMPRESSIBLE_TYPES = {'application/json', 'text/csv', 'text/html', 'text/css', 'text/plain', 'application/javascript'}
+
+def new_compressor(encoding):
+    if encoding == 'br':
+        return brotli.Compressor(quality=app.config['COMPRESS_BROTLI_QUALITY'])
+    # wbits=31 selects the gzip container
+    return zlib.compressobj(app.config['COMPRESS_GZIP_LEVEL'], zlib.DEFLATED, 31)
+
+def compress_body(body, encoding):
+    compressor = new_compressor(encoding)
+    if encoding == 'br':
+        return compressor.process(body) + compressor.finish()
+    return compressor.compress(body) + compressor.flush()
+
+# Compress a streamed body chunk by chunk, flushing after each one so the
+# client still receives data as soon as it is produced
+def compress_stream(chunks, encoding):
+    compressor = new_compressor(encoding)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        if encoding == 'br':
+            data = compressor.process(chunk) + compressor.flush()
+        else:
+            data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.finish() if encoding == 'br' else compressor.flush()
+
+@app.after_request
+def compress_response(response):
+    if (response.status_code != 200 or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+    
+    offered = ['br', 'gzip'] if brotli else ['gzip']
+    encoding = request.accept_encodings.best_match(offered)
+    if encoding is None:
+        return response
     
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        body = response.get_data()
+        if len(body) < app.config['COMPRESS_MIN_SIZE']:
+            return response
+        response.set_data(compress_body(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+with app.app_context():
+    init_db()
+
+@app.cli.command('rebuild-rollups')
+def rebuild_rollups_command():
+    """Recompute the daily sales rollups from the sales table."""
+    conn = get_db()
+    c = conn.cursor()
+    c.execute('BEGIN IMMEDIATE')
+    rebuild_rollups(c)
     conn.commit()
-    conn.close()
-
-init_db()
+    c.execute('SELECT COUNT(*) FROM sales_daily')
+    print(f'Rebuilt sales_daily: {c.fetchone()[0]} rows')
+
+# Page cache: each template is compiled once per worker, and its rendered
+# HTML (plus compressed copies, made on first request) is kept until the
+# version it was rendered for changes
+compiled_templates = {}
+rendered_pages = {}
+
+def cached_page(name, source, version, **context):
+    page = rendered_pages.get(name)
+    if page is None or page['version'] != version:
+        template = compiled_templates.get(name)
+        if template is None:
+            template = compiled_templates[name] = app.jinja_env.from_string(source)
+        html = template.render(**context).encode('utf-8')
+        page = {
+            'version': version,
+            'bodies': {None: html},
+            'etag': hashlib.sha1(html).hexdigest(),
+            'modified': datetime.now(timezone.utc).replace(microsecond=0)
+        }
+        rendered_pages[name] = page
+    
+    offered = ['br', 'gzip'] if brotli else ['gzip']
+    encoding = request.accept_encodings.best_match(offered)
+    body = page['bodies'].get(encoding)
+    if body is None:
+        body = page['bodies'][encoding] = compress_body(page['bodies'][None], encoding)
+    response = with_etag(Response(body, mimetype='text/html'), page['etag'])
+    response.vary.add('Accept-Encoding')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.last_modified = page['modified']
+    return response.make_conditional(request)
+
+# Static assets: the pages' CSS and JS live in static/ and are minified,
+# fingerprinted and precompressed once at startup, then served from memory
+# under content-hashed URLs that browsers may cache forever
+ASSET_DIR = os.path.join(app.root_path, 'static')
+ASSET_TYPES = {'.css': 'text/css', '.js': 'application/javascript'}
+
+def minify_css(text):
+    text = re.sub(r'/\*.*?\*/', '', text, flags=re.S)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+    return re.sub(r':\s+', ':', text).replace(';}', '}').strip()
+
+# Template literals (and the ${...} expressions in them) still open at the end
+# of a line, tracked across lines. Quotes and // comments are recognised;
+# regex literals and /* */ comments are not, and static/ uses neither.
+def js_open_templates(line, stack):
+    quote = None
+    i = 0
+    while i < len(line):
+        char = line[i]
+        if quote:
+            if char == '\\':
+                i += 1
+            elif char == quote:
+                quote = None
+        elif stack and stack[-1] == '`':
+            if char == '\\':
+                i += 1
+            elif char == '`':
+                stack.pop()
+            elif line.startswith('${', i):
+                stack.append('{')
+                i += 1
+        elif char in '\'"':
+            quote = char
+        elif char == '`':
+            stack.append('`')
+        elif line.startswith('//', i):
+            break
+        elif char == '{' and stack:
+            stack.append('{')
+        elif char == '}' and stack:
+            stack.pop()
+        i += 1
+    return stack
+
+# Conservative on purpose: only indentation, blank lines and whole-line
+# comments go. Lines inside a multi-line template literal are kept verbatim,
+# since their whitespace is part of the string.
+def minify_js(text):
+    lines = []
+    stack = []
+    for line in text.splitlines():
+        inside = bool(stack) and stack[-1] == '`'
+        stack = js_open_templates(line, stack)
+        if inside:
+            lines.append(line)
+            continue
+        line = line.lstrip() if stack and stack[-1] == '`' else line.strip()
+        if line and not line.startswith('//'):
+            lines.append(line)
+    return '\n'.join(lines)
+
+def build_assets():
+    assets = {}
+    for name in sorted(os.listdir(ASSET_DIR)):
+        stem, ext = os.path.splitext(name)
+        if ext not in ASSET_TYPES:
+            continue
+        with open(os.path.join(ASSET_DIR, name), encoding='utf-8') as f:
+            text = f.read()
+        body = (minify_css if ext == '.css' else minify_js)(text).encode('utf-8')
+        digest = hashlib.sha1(body).hexdigest()[:12]
+        bodies = {None: body, 'gzip': gzip.compress(body, 9, mtime=0)}
+        if brotli:
+            bodies['br'] = brotli.compress(body, quality=11)
+        assets[name] = {'file': f'{stem}.{digest}{ext}', 'digest': digest,
+                        'mimetype': ASSET_TYPES[ext], 'bodies': bodies}
+    return assets
+
+assets = build_assets()
+asset_files = {asset['file']: asset for asset in assets.values()}
+asset_urls = {name: f"/assets/{asset['file']}" for name, asset in assets.items()}
+
+@app.route('/assets/<filename>')
+def serve_asset(filename):
+    asset = asset_files.get(filename)
+    if asset is None:
+        abort(404)
+    encoding = request.accept_encodings.best_match([e for e in ['br', 'gzip'] if e in asset['bodies']])
+    response = Response(asset['bodies'][encoding], mimetype=asset['mimetype'])
+    response.vary.add('Accept-Encoding')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.set_etag(asset['digest'])
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
 
 @app.route('/')
 def index():
-    return render_template_string(HTML_TEMPLATE, 
-                                machines=master_data.get('machines', []),
-                                vendors=master_data.get('vendors', []),
-                                models=master_data.get('models', []))
+    current = master_data.refresh(get_db().cursor())
+    return cached_page('index', HTML_TEMPLATE, current.version, assets=asset_urls,
+                       machines=current.data['machines'],
+                       vendors=current.data['vendors'],
+                       models=current.data['models'])
 
 @app.route('/master-data-editor')
 def master_data_editor():
-    return render_template_string(MASTER_EDITOR_TEMPLATE, card_types=CARD_TYPES)
+    return cached_page('master-data-editor', MASTER_EDITOR_TEMPLATE, None, assets=asset_urls,
+                       card_types=CARD_TYPES)
+
+def read_master_data(c):
+    c.execute('SELECT number, type FROM inventory ORDER BY number, type, id')
+    data = {'cards': [{'number': number, 'type': card_type} for number, card_type in c.fetchall()]}
+    for key in MASTER_LISTS:
+        data[key] = []
+    c.execute('SELECT list, name FROM master_names ORDER BY list, name')
+    for key, name in c.fetchall():
+        data.setdefault(key, []).append(name)
+    return data
+
+# Per-worker copy of the master data document. It is stamped with the table
+# versions of inventory and the name lists, so one cheap query per request
+# tells whether another worker has saved since.
+class MasterData:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.data = None
+
+    def refresh(self, c):
+        version = f"{table_version(c, 'inventory')}:{table_version(c, 'master')}"
+        if version != self.version:
+            with self.lock:
+                if version != self.version:
+                    self.data = read_master_data(c)
+                    self.version = version
+        return self
+
+master_data = MasterData()
 
 @app.route('/api/master-data', methods=['GET'])
 def get_master_data():
-    return jsonify({'success': True, 'data': master_data})
+    current = master_data.refresh(get_db().cursor())
+    etag = request_etag(current.version)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    return with_etag(jsonify({'success': True, 'data': current.data}), etag)
+
+# The master data document in the JSON file format, as a download
+@app.route('/api/master-data/export', methods=['GET'])
+def export_master_data():
+    data = master_data.refresh(get_db().cursor()).data
+    return Response(json.dumps(data, indent=2), mimetype='application/json', headers={
+        'Content-Disposition': 'attachment; filename=master_data.json'
+    })
+
+# Bring inventory in line with `cards`, a multiset of (number, type) pairs
+# (duplicates are allowed), touching only the rows that differ. Existing rows
+# are kept oldest first. Returns (inserted, deleted) counts.
+def sync_inventory(c, cards):
+    # Compared as text on both sides: a number sent as JSON 1234 is the
+    # stored TEXT '1234'
+    wanted = Counter((str(card['number']), str(card['type'])) for card in cards)
+    c.execute('SELECT id, number, type FROM inventory ORDER BY id')
+    stale = []
+    for inv_id, number, card_type in c.fetchall():
+        key = (str(number), str(card_type))
+        if wanted[key] > 0:
+            wanted[key] -= 1
+        else:
+            stale.append(inv_id)
+    added = list(wanted.elements())
+    
+    if stale:
+        c.executemany('DELETE FROM inventory WHERE id = ?', [(inv_id,) for inv_id in stale])
+        record_changes(c, 'inventory', 'delete', stale)
+    if added:
+        c.execute('SELECT COALESCE(MAX(id), 0) FROM inventory')
+        last_id = c.fetchone()[0]
+        c.executemany('INSERT INTO inventory (number, type) VALUES (?,?)', added)
+        c.execute('SELECT id FROM inventory WHERE id > ?', (last_id,))
+        record_changes(c, 'inventory', 'upsert', [row[0] for row in c.fetchall()])
+    return len(added), len(stale)
+
+# Same for the machine, vendor and model lists; changes are logged as
+# 'master' rows keyed '<list>:<name>'
+def sync_master_names(c, data):
+    c.execute('SELECT list, name FROM master_names')
+    stored = set(c.fetchall())
+    wanted = {(key, name) for key in MASTER_LISTS for name in data[key]}
+    stale = sorted(stored - wanted)
+    added = sorted(wanted - stored)
+    if stale:
+        c.executemany('DELETE FROM master_names WHERE list = ? AND name = ?', stale)
+        record_changes(c, 'master', 'delete', [f'{key}:{name}' for key, name in stale])
+    if added:
+        c.executemany('INSERT INTO master_names (list, name) VALUES (?,?)', added)
+        record_changes(c, 'master', 'upsert', [f'{key}:{name}' for key, name in added])
+
+def valid_master_data(data):
+    return (isinstance(data, dict)
+            and all(isinstance(data.get(key), list) for key in ['cards'] + MASTER_LISTS)
+            and all(isinstance(card, dict) and card.get('number') and card.get('type') for card in data['cards'])
+            and all(isinstance(name, str) for key in MASTER_LISTS for name in data[key]))
+
+# Store a complete master data document as diffs against the tables, inside
+# the caller's write transaction. Returns (cards added, cards removed).
+def store_master_data(c, data):
+    inserted, deleted = sync_inventory(c, data['cards'])
+    sync_master_names(c, data)
+    return inserted, deleted
+
+def master_data_saved(c, inserted, deleted):
+    # Own commits do not move this connection's data_version
+    card_index.refresh(c, force=True)
+    return jsonify({
+        'success': True,
+        'message': 'Master data updated successfully',
+        'cardsAdded': inserted,
+        'cardsRemoved': deleted
+    })
 
 @app.route('/api/master-data', methods=['POST'])
 def update_master_data():
-    global master_data
     data = request.json
     
     # Validate data structure
-    if not all(key in data for key in ['cards', 'machines', 'vendors', 'models']):
+    if not valid_master_data(data):
         return jsonify({'success': False, 'error': 'Invalid data structure'}), 400
     
-    # Save to file
-    save_master_data(data)
-    master_data = data
-    
-    # Update inventory - clear and reload all cards
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_db()
     c = conn.cursor()
-    
-    # Clear existing inventory
-    c.execute('DELETE FROM inventory')
-    
-    # Insert all cards from master data (allows complete duplicates)
-    if data['cards']:
-        all_cards = [(card['number'], card['type']) for card in data['cards']]
-        c.executemany('INSERT INTO inventory (number, type) VALUES (?,?)', all_cards)
-    
+    c.execute('BEGIN IMMEDIATE')
+    inserted, deleted = store_master_data(c, data)
     conn.commit()
-    conn.close()
+    return master_data_saved(c, inserted, deleted)
+
+# Incremental edits: {"add": {...}, "remove": {...}}, each with any of cards,
+# machines, vendors and models. Names are added once; cards may repeat, and
+# each removed card drops one matching entry.
+@app.route('/api/master-data', methods=['PATCH'])
+def patch_master_data():
+    data = request.json
+    if not isinstance(data, dict) or not set(data) <= {'add', 'remove'}:
+        return jsonify({'success': False, 'error': 'Expected "add" and/or "remove"'}), 400
+    changes = {}
+    for action in ['add', 'remove']:
+        part = data.get(action) or {}
+        if not isinstance(part, dict) or not set(part) <= set(['cards'] + MASTER_LISTS):
+            return jsonify({'success': False, 'error': f'Invalid "{action}"'}), 400
+        changes[action] = {key: part.get(key, []) for key in ['cards'] + MASTER_LISTS}
+        if not valid_master_data(changes[action]):
+            return jsonify({'success': False, 'error': f'Invalid "{action}"'}), 400
     
-    return jsonify({'success': True, 'message': 'Master data updated successfully'})
+    # Read-modify-write under the write lock, so concurrent edits from any
+    # worker apply one after the other
+    conn = get_db()
+    c = conn.cursor()
+    c.execute('BEGIN IMMEDIATE')
+    updated = read_master_data(c)
+    for key in MASTER_LISTS:
+        updated[key] = sorted(set(updated[key]) - set(changes['remove'][key]) | set(changes['add'][key]))
+    removed = Counter((str(card['number']), str(card['type'])) for card in changes['remove']['cards'])
+    cards = []
+    for card in updated['cards']:
+        key = (str(card['number']), str(card['type']))
+        if removed[key] > 0:
+            removed[key] -= 1
+        else:
+            cards.append(card)
+    cards.extend({'number': card['number'], 'type': card['type']} for card in changes['add']['cards'])
+    updated['cards'] = cards
+    inserted, deleted = store_master_data(c, updated)
+    conn.commit()
+    return master_data_saved(c, inserted, deleted)
+
+@app.cli.command('export-master-data')
+@click.argument('path', default=MASTER_DATA_PATH)
+def export_master_data_command(path):
+    """Write the master data to a JSON file."""
+    data = read_master_data(get_db().cursor())
+    save_master_data(data, path)
+    print(f"Exported {len(data['cards'])} cards to {path}")
+
+@app.cli.command('import-master-data')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+def import_master_data_command(path):
+    """Replace the master data with the contents of a JSON file."""
+    data = load_master_data(path)
+    if not valid_master_data(data):
+        raise click.ClickException('Invalid data structure')
+    conn = get_db()
+    c = conn.cursor()
+    c.execute('BEGIN IMMEDIATE')
+    inserted, deleted = store_master_data(c, data)
+    conn.commit()
+    print(f'Imported {path}: {inserted} cards added, {deleted} removed')
 
 @app.route('/api/validate-card/<number>', methods=['GET'])
 def validate_card(number):
     # Get all cards with this number from inventory
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_db()
     c = conn.cursor()
-    c.execute('SELECT DISTINCT type FROM inventory WHERE number = ?', (number,))
-    types = [row[0] for row in c.fetchall()]
-    conn.close()
+    types = card_index.refresh(c).types_of(number)
+    c.execute('SELECT EXISTS (SELECT 1 FROM sales WHERE cardNumber = ?)', (number,))
+    used = bool(c.fetchone()[0])
     
     return jsonify({
         'success': True,
         'exists': len(types) > 0,
-        'types': types
+        'types': types,
+        'used': used
     })
 
+SALES_COLUMNS = ['id', 'dateTime', 'cardNumber', 'cardType', 'machine', 'vendor', 'model', 'amount', 'type']
+MAX_PAGE_SIZE = 1000
+
+# [start, end) dateTime bounds of a YYYY-MM month, so the filter stays an index range
+def month_range(month):
+    start = datetime.strptime(month, '%Y-%m')
+    if start.month == 12:
+        end = start.replace(year=start.year + 1, month=1)
+    else:
+        end = start.replace(month=start.month + 1)
+    return start.strftime('%Y-%m'), end.strftime('%Y-%m')
+
+# Translate sales filters (startDate, endDate, month, cardType, vendor, model,
+# machine, q) into WHERE clauses; raises ValueError on malformed values
+def sales_filter_sql(filters):
+    clauses = []
+    params = []
+    
+    if filters.get('startDate'):
+        clauses.append('dateTime >= ?')
+        params.append(filters['startDate'] + 'T00:00:00')
+    if filters.get('endDate'):
+        clauses.append('dateTime <= ?')
+        params.append(filters['endDate'] + 'T23:59:59')
+    if filters.get('month'):
+        try:
+            start, end = month_range(filters['month'])
+        except ValueError:
+            raise ValueError('month must be YYYY-MM')
+        clauses.append('dateTime >= ? AND dateTime < ?')
+        params.extend([start, end])
+    for column in ['cardType', 'vendor', 'model', 'machine']:
+        if filters.get(column):
+            clauses.append(f'{column} = ?')
+            params.append(filters[column])
+    
+    term = (filters.get('q') or '').strip()
+    if term and search_enabled and len(term) >= 3:
+        clauses.append('rowid IN (SELECT rowid FROM sales_fts WHERE sales_fts MATCH ?)')
+        params.append('"' + term.replace('"', '""') + '"')
+    elif term:
+        # Trigrams need at least three characters; shorter terms scan
+        pattern = '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        clauses.append('(' + ' OR '.join(f"{col} LIKE ? ESCAPE '\\'" for col in SEARCH_COLUMNS) + ')')
+        params.extend([pattern] * len(SEARCH_COLUMNS))
+    
+    return clauses, params
+
+DICTIONARY_COLUMNS = {'cardType', 'machine', 'vendor', 'model', 'type'}
+
+def sale_to_dict(row):
+    return dict(zip(SALES_COLUMNS, row))
+
+# Columnar listing: one array per column; low-cardinality columns are sent as
+# {'values': distinct values, 'codes': index into values per row}
+def sales_to_columns(rows):
+    columns = {}
+    for name, values in zip(SALES_COLUMNS, zip(*rows) if rows else [()] * len(SALES_COLUMNS)):
+        if name in DICTIONARY_COLUMNS:
+            index = {}
+            codes = [index.setdefault(value, len(index)) for value in values]
+            columns[name] = {'values': list(index), 'codes': codes}
+        else:
+            columns[name] = list(values)
+    return columns
+
+# Pagination cursors are opaque to clients: base64 of the last row's sort key,
+# e.g. (dateTime, id) for the sales listing
+def encode_cursor(*key):
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+def decode_cursor(token, size=2):
+    try:
+        key = json.loads(base64.urlsafe_b64decode(token.encode()))
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+    if (not isinstance(key, list) or len(key) != size
+            or not all(isinstance(value, (str, int)) for value in key)):
+        raise ValueError('Invalid cursor')
+    return key
+
 @app.route('/api/sales', methods=['GET'])
 def get_sales():
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_db()
     c = conn.cursor()
-    c.execute('SELECT * FROM sales ORDER BY dateTime DESC')
+    etag = request_etag(table_version(c, 'sales'))
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    
+    limit = request.args.get('limit', type=int)
+    cursor = request.args.get('cursor')
+    
+    try:
+        clauses, params = sales_filter_sql(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    # Keyset pagination on (dateTime, id): every page is an index range scan,
+    # no matter how deep. Without limit/cursor the full list is returned.
+    if cursor:
+        try:
+            params.extend(decode_cursor(cursor))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        clauses.append('(dateTime, id) < (?, ?)')
+    
+    query = 'SELECT * FROM sales'
+    if clauses:
+        query += ' WHERE ' + ' AND '.join(clauses)
+    query += ' ORDER BY dateTime DESC, id DESC'
+    if cursor and limit is None:
+        limit = MAX_PAGE_SIZE
+    if limit is not None:
+        if limit < 1:
+            return jsonify({'success': False, 'error': 'limit must be positive'}), 400
+        limit = min(limit, MAX_PAGE_SIZE)
+        query += ' LIMIT ?'
+        params.append(limit)
+    
+    c.execute(query, params)
     rows = c.fetchall()
-    conn.close()
     
-    sales = []
-    for row in rows:
-        sales.append({
-            'id': row[0], 'dateTime': row[1], 'cardNumber': row[2],
-            'cardType': row[3], 'machine': row[4], 'vendor': row[5],
-            'model': row[6], 'amount': row[7], 'type': row[8]
-        })
-    return jsonify({'success': True, 'data': sales})
+    next_cursor = None
+    if limit is not None and len(rows) == limit:
+        next_cursor = encode_cursor(rows[-1][1], rows[-1][0])
+    if request.args.get('format') == 'columnar':
+        payload = {'success': True, 'format': 'columnar', 'length': len(rows),
+                   'columns': SALES_COLUMNS, 'data': sales_to_columns(rows)}
+    else:
+        payload = {'success': True, 'data': [sale_to_dict(row) for row in rows]}
+    payload['next_cursor'] = next_cursor
+    return with_etag(jsonify(payload), etag)
+
+CARD_IN_INVENTORY_SQL = 'EXISTS (SELECT 1 FROM inventory WHERE number = ? AND type = ?)'
 
 @app.route('/api/sales', methods=['POST'])
 def add_sale():
     data = request.json
     
-    # Validate card exists in master data
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('SELECT COUNT(*) FROM inventory WHERE number = ? AND type = ?', 
-              (data['cardNumber'], data['cardType']))
-    count = c.fetchone()[0]
-    conn.close()
-    
-    if count == 0:
-        return jsonify({'success': False, 'error': 'Card not found in master data'}), 400
-    
-    conn = sqlite3.connect(DB_PATH)
+    # Validate the card against master data and insert in one write
+    # transaction, so a concurrent master data save cannot slip in between
+    conn = get_db()
     c = conn.cursor()
-    c.execute('INSERT INTO sales VALUES (?,?,?,?,?,?,?,?,?)', (
+    c.execute('BEGIN IMMEDIATE')
+    c.execute(f'INSERT INTO sales SELECT ?,?,?,?,?,?,?,?,? WHERE {CARD_IN_INVENTORY_SQL}', (
         str(data['id']), data['dateTime'], data['cardNumber'],
         data['cardType'], data['machine'], data['vendor'],
-        data['model'], data['amount'], data['type']
+        data['model'], data['amount'], data['type'],
+        data['cardNumber'], data['cardType']
     ))
+    if c.rowcount == 0:
+        conn.rollback()
+        return jsonify({'success': False, 'error': 'Card not found in master data'}), 400
+    
+    record_changes(c, 'sales', 'upsert', [data['id']])
     conn.commit()
-    conn.close()
     return jsonify({'success': True})
 
 @app.route('/api/sales/<id>', methods=['PUT'])
 def update_sale(id):
     data = request.json
     
-    # Validate card exists in master data
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('SELECT COUNT(*) FROM inventory WHERE number = ? AND type = ?', 
-              (data['cardNumber'], data['cardType']))
-    count = c.fetchone()[0]
-    conn.close()
-    
-    if count == 0:
-        return jsonify({'success': False, 'error': 'Card not found in master data'}), 400
-    
-    conn = sqlite3.connect(DB_PATH)
+    # Same as add_sale: the card check and the update share a transaction
+    conn = get_db()
     c = conn.cursor()
-    c.execute('''UPDATE sales SET 
+    c.execute('BEGIN IMMEDIATE')
+    c.execute(f'''UPDATE sales SET 
         dateTime=?, cardNumber=?, cardType=?, machine=?, 
-        vendor=?, model=?, amount=?, type=? WHERE id=?''', (
+        vendor=?, model=?, amount=?, type=? WHERE id=? AND {CARD_IN_INVENTORY_SQL}''', (
         data['dateTime'], data['cardNumber'], data['cardType'],
         data['machine'], data['vendor'], data['model'],
-        data['amount'], data['type'], id
+        data['amount'], data['type'], id,
+        data['cardNumber'], data['cardType']
     ))
+    if c.rowcount:
+        record_changes(c, 'sales', 'upsert', [id])
+    else:
+        # Nothing updated: either an unknown sale (a no-op, as before) or a bad card
+        c.execute(f'SELECT {CARD_IN_INVENTORY_SQL}', (data['cardNumber'], data['cardType']))
+        if not c.fetchone()[0]:
+            conn.rollback()
+            return jsonify({'success': False, 'error': 'Card not found in master data'}), 400
     conn.commit()
-    conn.close()
     return jsonify({'success': True})
 
+MAX_BULK_SALES = 50000
+
+# Validate a batch of sales against inventory and existing ids; returns the
+# rows to insert and one result per record, in request order
+def validate_sales_batch(c, records):
+    numbers = json.dumps(sorted({str(r.get('cardNumber')) for r in records if isinstance(r, dict)}))
+    c.execute('SELECT DISTINCT number, type FROM inventory WHERE number IN (SELECT value FROM json_each(?))',
+              (numbers,))
+    cards = set(c.fetchall())
+    ids = json.dumps([str(r.get('id')) for r in records if isinstance(r, dict)])
+    c.execute('SELECT id FROM sales WHERE id IN (SELECT value FROM json_each(?))', (ids,))
+    seen = {row[0] for row in c.fetchall()}
+
+    rows = []
+    results = []
+    for record in records:
+        if not isinstance(record, dict):
+            results.append({'id': None, 'success': False, 'error': 'Record must be an object'})
+            continue
+        values = tuple(map(record.get, SALES_COLUMNS))
+        sale_id = str(values[0]) if values[0] is not None else None
+        if None in values:
+            error = 'Missing ' + ', '.join(col for col, value in zip(SALES_COLUMNS, values) if value is None)
+        elif (str(values[2]), str(values[3])) not in cards:
+            error = 'Card not found in master data'
+        elif type(values[7]) not in (int, float):
+            error = 'Invalid amount'
+        elif sale_id in seen:
+            error = 'Duplicate sale id'
+        else:
+            error = None
+            seen.add(sale_id)
+            rows.append((sale_id,) + values[1:])
+        results.append({'id': sale_id, 'success': error is None, 'error': error})
+    return rows, results
+
+BULK_TRIGGER_THRESHOLD = 1000
+
+# Insert sales rows in the current transaction. Large batches drop the insert
+# triggers, then update the search index, rollups and card log with one
+# statement each and recreate the triggers before the transaction commits.
+# (A WHEN clause switching the triggers off still costs every row the trigger
+# call, about 10 us, where the DDL is a one-off.)
+def insert_sales(c, rows):
+    triggers = []
+    if len(rows) >= BULK_TRIGGER_THRESHOLD:
+        c.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name IN (?,?,?)",
+                  list(SALES_INSERT_TRIGGERS))
+        triggers = [row[0] for row in c.fetchall()]
+    c.execute('SELECT COALESCE(MAX(rowid), 0) FROM sales')
+    last_rowid = c.fetchone()[0]
+    for name in triggers:
+        c.execute(f'DROP TRIGGER {name}')
+    c.executemany('INSERT INTO sales VALUES (?,?,?,?,?,?,?,?,?)', rows)
+    for name in triggers:
+        c.execute(SALES_INSERT_TRIGGERS[name][1], (last_rowid,))
+        create_insert_trigger(c, name)
+
+# Bulk ingestion (e.g. end-of-day batches from the machines): valid records
+# are inserted together in one transaction, invalid ones reported per row
+@app.route('/api/sales/bulk', methods=['POST'])
+def bulk_add_sales():
+    data = request.json
+    records = data.get('sales') if isinstance(data, dict) else None
+    if not isinstance(records, list) or not records:
+        return jsonify({'success': False, 'error': 'No sales provided'}), 400
+    if len(records) > MAX_BULK_SALES:
+        return jsonify({'success': False, 'error': f'At most {MAX_BULK_SALES} sales per request'}), 400
+
+    conn = get_db()
+    c = conn.cursor()
+    c.execute('BEGIN IMMEDIATE')
+    rows, results = validate_sales_batch(c, records)
+    insert_sales(c, rows)
+    record_changes(c, 'sales', 'upsert', [row[0] for row in rows])
+    conn.commit()
+
+    return jsonify({
+        'success': True,
+        'inserted': len(rows),
+        'failed': len(records) - len(rows),
+        'results': results
+    })
+
 @app.route('/api/sales/<id>', methods=['DELETE'])
 def delete_sale(id):
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_db()
     c = conn.cursor()
     c.execute('DELETE FROM sales WHERE id=?', (id,))
+    if c.rowcount:
+        record_changes(c, 'sales', 'delete', [id])
     conn.commit()
-    conn.close()
     return jsonify({'success': True})
 
 # NEW: Bulk delete endpoint
@@ -219,69 +1191,903 @@ def bulk_delete_sales():
     if not ids:
         return jsonify({'success': False, 'error': 'No IDs provided'}), 400
     
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_db()
     c = conn.cursor()
     
-    # Use parameterized query with multiple placeholders
-    placeholders = ','.join(['?' for _ in ids])
-    c.execute(f'DELETE FROM sales WHERE id IN ({placeholders})', ids)
-    
-    deleted_count = c.rowcount
+    # Only ids that exist are deleted and logged; the write lock keeps the
+    # lookup and the delete consistent
+    c.execute('BEGIN IMMEDIATE')
+    c.execute('SELECT id FROM sales WHERE id IN (SELECT value FROM json_each(?))', (json.dumps([str(i) for i in ids]),))
+    existing = [row[0] for row in c.fetchall()]
+    if existing:
+        c.execute('DELETE FROM sales WHERE id IN (SELECT value FROM json_each(?))', (json.dumps(existing),))
+        record_changes(c, 'sales', 'delete', existing)
     conn.commit()
-    conn.close()
+    deleted_count = len(existing)
     
     return jsonify({'success': True, 'deleted_count': deleted_count})
 
 @app.route('/api/inventory', methods=['GET'])
 def get_inventory():
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_db()
     c = conn.cursor()
-    c.execute('SELECT number, type FROM inventory ORDER BY type, number')
+    etag = request_etag(table_version(c, 'inventory'))
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    
+    c.execute('SELECT id, number, type FROM inventory ORDER BY type, number')
     rows = c.fetchall()
-    conn.close()
     
-    inventory = [{'number': row[0], 'type': row[1]} for row in rows]
-    return jsonify({'success': True, 'data': inventory})
+    inventory = [{'id': row[0], 'number': row[1], 'type': row[2]} for row in rows]
+    return with_etag(jsonify({'success': True, 'data': inventory}), etag)
 
-@app.route('/api/export/csv', methods=['POST'])
-def export_csv():
-    data = request.json
-    filters = data.get('filters', {})
+USAGE_PAGE_SIZE = 500
+
+# WHERE clauses for the card usage listing (inventory LEFT JOIN sales). With
+# remainingForModel the listing turns into "cards never sold for that model",
+# where the month and model row filters do not apply.
+def usage_filter_sql(filters):
+    clauses = []
+    params = []
+    remaining_model = filters.get('model') if filters.get('remainingForModel') else None
+    
+    if filters.get('cardNumber'):
+        clauses.append('i.number = ?')
+        params.append(filters['cardNumber'])
+    if filters.get('cardType'):
+        clauses.append('i.type = ?')
+        params.append(filters['cardType'])
+    if filters.get('status') == 'Used':
+        clauses.append('s.id IS NOT NULL')
+    elif filters.get('status') == 'Available':
+        clauses.append('s.id IS NULL')
+    if filters.get('vendor'):
+        clauses.append('s.vendor = ?')
+        params.append(filters['vendor'])
+    if remaining_model:
+        clauses.append('NOT EXISTS (SELECT 1 FROM sales u WHERE u.cardNumber = i.number AND u.model = ?)')
+        params.append(remaining_model)
+    else:
+        if filters.get('model'):
+            clauses.append('s.model = ?')
+            params.append(filters['model'])
+        if filters.get('month'):
+            try:
+                start, end = month_range(filters['month'])
+            except ValueError:
+                raise ValueError('month must be YYYY-MM')
+            clauses.append('s.dateTime >= ? AND s.dateTime < ?')
+            params.extend([start, end])
     
-    conn = sqlite3.connect(DB_PATH)
+    term = (filters.get('q') or '').strip()
+    if term:
+        pattern = '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        clauses.append("(i.number LIKE ? ESCAPE '\\' OR s.vendor LIKE ? ESCAPE '\\' OR s.model LIKE ? ESCAPE '\\')")
+        params.extend([pattern] * 3)
+    return clauses, params
+
+# Per-worker card and sale totals for the usage stats, stamped with the
+# inventory and sales table versions: the COUNT(DISTINCT) scan over all of
+# sales only runs again after one of them has been written.
+class UsageTotals:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.totals = None
+
+    def refresh(self, c):
+        version = (table_version(c, 'inventory'), table_version(c, 'sales'))
+        if version != self.version:
+            with self.lock:
+                if version != self.version:
+                    c.execute('SELECT COUNT(*) FROM inventory')
+                    total = c.fetchone()[0]
+                    c.execute('SELECT COUNT(DISTINCT cardNumber), COUNT(*) FROM sales')
+                    used, transactions = c.fetchone()
+                    self.totals = {'total': total, 'used': used, 'available': total - used,
+                                   'transactions': transactions}
+                    self.version = version
+        return self.totals
+
+usage_totals = UsageTotals()
+
+def usage_stats(c, filters):
+    stats = dict(usage_totals.refresh(c))
+    
+    if filters.get('remainingForModel') and filters.get('model'):
+        eligible, remaining, _ = card_usage.refresh(c).remaining(filters['model'], filters.get('cardType'))
+        stats['remaining'] = {'eligible': eligible, 'remaining': remaining}
+    return stats
+
+def usage_options(c):
+    options = {}
+    for name, query in [('cardNumbers', 'SELECT DISTINCT number FROM inventory ORDER BY number'),
+                        ('cardTypes', 'SELECT DISTINCT type FROM inventory ORDER BY type'),
+                        ('vendors', 'SELECT DISTINCT vendor FROM sales WHERE vendor IS NOT NULL ORDER BY vendor'),
+                        ('models', 'SELECT DISTINCT model FROM sales WHERE model IS NOT NULL ORDER BY model')]:
+        c.execute(query)
+        options[name] = [row[0] for row in c.fetchall()]
+    return options
+
+# Bitmaps are plain ints: bit i stands for the i-th distinct inventory card
+# number, so set operations run in C at a few KiB per 100k cards
+def bitmap(positions):
+    bits = bytearray()
+    for i in positions:
+        byte = i >> 3
+        if byte >= len(bits):
+            bits.extend(bytes(byte - len(bits) + 1))
+        bits[byte] |= 1 << (i & 7)
+    return int.from_bytes(bits, 'little')
+
+def bitmap_positions(bits, offset=0, limit=None):
+    digits = bin(bits)[:1:-1]
+    positions = []
+    i = digits.find('1')
+    while i >= 0 and (limit is None or len(positions) < offset + limit):
+        positions.append(i)
+        i = digits.find('1', i + 1)
+    return positions[offset:]
+
+bit_count = getattr(int, 'bit_count', lambda bits: bin(bits).count('1'))
+
+REBUILD_CARD_THRESHOLD = 1000
+
+# Per-worker index of which inventory cards have been sold for each model, and
+# which cards exist for each card type. Before answering it catches up with the
+# change log: an inventory change rebuilds it, sales writes (from any worker)
+# re-read only the cards they touched.
+class CardUsageIndex:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.inventory_version = None
+        self.seq = 0
+        self.numbers = []
+        self.position = {}
+        self.all_cards = 0
+        self.types = {}
+        self.models = {}
+
+    def refresh(self, c):
+        # Read the versions before the data: anything written in between is
+        # replayed on the next refresh, and replaying a card is idempotent
+        inventory_version = table_version(c, 'inventory')
+        seq = current_change_seq(c)
+        with self.lock:
+            if inventory_version != self.inventory_version:
+                self.rebuild(c)
+            elif seq != self.seq:
+                c.execute('SELECT MIN(seq) FROM changes')
+                oldest = c.fetchone()[0]
+                c.execute("SELECT DISTINCT key FROM changes WHERE tbl = 'cards' AND seq > ? AND seq <= ?",
+                          (self.seq, seq))
+                cards = [row[0] for row in c.fetchall()]
+                if (oldest or 0) > self.seq + 1 or len(cards) > REBUILD_CARD_THRESHOLD:
+                    self.rebuild(c)
+                elif cards:
+                    self.update_cards(c, cards)
+            self.inventory_version = inventory_version
+            self.seq = seq
+        return self
+
+    def rebuild(self, c):
+        c.execute('SELECT DISTINCT number FROM inventory ORDER BY number')
+        self.numbers = [row[0] for row in c.fetchall()]
+        self.position = {number: i for i, number in enumerate(self.numbers)}
+        self.all_cards = (1 << len(self.numbers)) - 1
+
+        c.execute('SELECT DISTINCT type, number FROM inventory')
+        self.types = self.group_bits(c.fetchall())
+        c.execute('SELECT DISTINCT model, cardNumber FROM sales WHERE model IS NOT NULL')
+        self.models = self.group_bits(c.fetchall())
+
+    def update_cards(self, c, cards):
+        cards = [card for card in cards if card in self.position]
+        if not cards:
+            return
+        rows = select_in(c, 'SELECT DISTINCT model, cardNumber FROM sales WHERE model IS NOT NULL AND cardNumber IN ({})', cards)
+        touched = bitmap(self.position[card] for card in cards)
+        used = self.group_bits(rows)
+        for model in set(self.models) | set(used):
+            bits = (self.models.get(model, 0) & ~touched) | used.get(model, 0)
+            if bits:
+                self.models[model] = bits
+            else:
+                self.models.pop(model, None)
+
+    def group_bits(self, rows):
+        groups = {}
+        for key, number in rows:
+            if number in self.position:
+                groups.setdefault(key, []).append(self.position[number])
+        return {key: bitmap(positions) for key, positions in groups.items()}
+
+    # Counts of eligible cards (of the type, or all) and of those never sold
+    # for the model, plus up to `limit` of the remaining card numbers
+    def remaining(self, model, card_type=None, offset=0, limit=0):
+        with self.lock:
+            eligible = self.types.get(card_type, 0) if card_type else self.all_cards
+            left = eligible & ~self.models.get(model, 0)
+            cards = [self.numbers[i] for i in bitmap_positions(left, offset, limit)] if limit else []
+            return bit_count(eligible), bit_count(left), cards
+
+card_usage = CardUsageIndex()
+
+# Card-to-sale comparison: one row per sale of each inventory card, or a single
+# 'Available' row for unsold cards, ordered by card and then sale time.
+# Keyset-paginated on (number, type, inventory id, sale dateTime, sale id).
+@app.route('/api/inventory/usage', methods=['GET'])
+def get_inventory_usage():
+    conn = get_db()
     c = conn.cursor()
+    etag = request_etag(f"{table_version(c, 'inventory')}:{table_version(c, 'sales')}")
+    cached = not_modified(etag)
+    if cached:
+        return cached
     
-    query = 'SELECT * FROM sales WHERE 1=1'
-    params = []
+    limit = min(request.args.get('limit', USAGE_PAGE_SIZE, type=int), MAX_PAGE_SIZE)
+    cursor = request.args.get('cursor')
+    if limit < 1:
+        return jsonify({'success': False, 'error': 'limit must be positive'}), 400
+    try:
+        clauses, params = usage_filter_sql(request.args)
+        if cursor:
+            number, card_type, inv_id, date_time, sale_id = decode_cursor(cursor, size=5)
+            clauses.append('''(i.number, i.type, i.id) >= (?, ?, ?) AND NOT ((i.number, i.type, i.id) = (?, ?, ?)
+                AND (COALESCE(s.dateTime, ''), COALESCE(s.id, '')) <= (?, ?))''')
+            params.extend([number, card_type, inv_id, number, card_type, inv_id, date_time, sale_id])
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    query = '''SELECT i.number, i.type, i.id, s.id, s.dateTime, s.vendor, s.model, s.amount
+        FROM inventory i LEFT JOIN sales s ON s.cardNumber = i.number'''
+    if clauses:
+        query += ' WHERE ' + ' AND '.join(clauses)
+    query += " ORDER BY i.number, i.type, i.id, COALESCE(s.dateTime, ''), COALESCE(s.id, '') LIMIT ?"
+    c.execute(query, params + [limit])
+    rows = c.fetchall()
+    
+    data = [{
+        'cardNumber': row[0], 'cardType': row[1],
+        'status': 'Used' if row[3] is not None else 'Available',
+        'dateTime': row[4], 'vendor': row[5], 'model': row[6], 'amount': row[7]
+    } for row in rows]
+    next_cursor = None
+    if len(rows) == limit:
+        last = rows[-1]
+        next_cursor = encode_cursor(last[0], last[1], last[2], last[4] or '', last[3] or '')
+    
+    payload = {'success': True, 'data': data, 'next_cursor': next_cursor}
+    # The first page also carries the tab's counters, and filter choices on request
+    if not cursor:
+        payload['stats'] = usage_stats(c, request.args)
+    if request.args.get('options'):
+        payload['options'] = usage_options(c)
+    return with_etag(jsonify(payload), etag)
+
+# Cards never sold for a model (optionally of one card type), answered from
+# the in-memory usage bitmaps. Cards are listed by number, `limit` at a time.
+@app.route('/api/inventory/remaining', methods=['GET'])
+def get_remaining_cards():
+    model = request.args.get('model')
+    if not model:
+        return jsonify({'success': False, 'error': 'model is required'}), 400
+    offset = request.args.get('offset', 0, type=int)
+    limit = min(request.args.get('limit', MAX_PAGE_SIZE, type=int), MAX_PAGE_SIZE)
+    if offset < 0 or limit < 0:
+        return jsonify({'success': False, 'error': 'offset and limit must not be negative'}), 400
     
+    c = get_db().cursor()
+    eligible, remaining, cards = card_usage.refresh(c).remaining(
+        model, request.args.get('cardType'), offset, limit)
+    next_offset = offset + len(cards) if limit and offset + len(cards) < remaining else None
+    return jsonify({
+        'success': True,
+        'model': model,
+        'cardType': request.args.get('cardType') or None,
+        'eligible': eligible,
+        'used': eligible - remaining,
+        'remaining': remaining,
+        'cards': cards,
+        'next_offset': next_offset
+    })
+
+@app.route('/api/sales/changes', methods=['GET'])
+def get_changes():
+    since = request.args.get('since', type=int)
+    conn = get_db()
+    c = conn.cursor()
+    seq = current_change_seq(c)
+    
+    # Without `since` only the current position is returned, to start from
+    if since is None:
+        return jsonify({'success': True, 'seq': seq})
+    
+    # Ask the client for a full reload if the log no longer covers `since`
+    # (pruned, or a different database) or the backlog is too large to replay
+    c.execute('SELECT MIN(seq) FROM changes')
+    oldest = c.fetchone()[0]
+    c.execute("SELECT COUNT(*) FROM changes WHERE seq > ? AND tbl IN ('sales', 'inventory')", (since,))
+    pending = c.fetchone()[0]
+    if since > seq or (pending and oldest > since + 1) or pending > MAX_SYNC_CHANGES:
+        return jsonify({'success': True, 'seq': seq, 'reset': True})
+    
+    # Only the latest operation per row matters
+    latest = {}
+    c.execute('SELECT tbl, key, op FROM changes WHERE seq > ? AND seq <= ? ORDER BY seq', (since, seq))
+    for table, key, op in c.fetchall():
+        latest[(table, key)] = op
+    
+    def keys(table, op):
+        return [k for (t, k), o in latest.items() if t == table and o == op]
+    
+    sales = select_in(c, 'SELECT * FROM sales WHERE id IN ({})', keys('sales', 'upsert'))
+    inventory = select_in(c, 'SELECT id, number, type FROM inventory WHERE id IN ({})',
+                          [int(k) for k in keys('inventory', 'upsert')])
+    return jsonify({
+        'success': True,
+        'seq': seq,
+        'reset': False,
+        'sales': {
+            'upserted': [sale_to_dict(row) for row in sales],
+            'deleted': keys('sales', 'delete')
+        },
+        'inventory': {
+            'upserted': [{'id': row[0], 'number': row[1], 'type': row[2]} for row in inventory],
+            'deleted': [int(k) for k in keys('inventory', 'delete')]
+        }
+    })
+
+REPORT_DIMENSIONS = [('byCardType', 'cardType'), ('byVendor', 'vendor'), ('byModel', 'model'), ('byMachine', 'machine')]
+
+# Roll (cardType, vendor, model, machine, count, amount) groups up into the
+# report totals and per-dimension breakdowns, largest amount first
+def summarize_groups(groups):
+    total = {'count': 0, 'amount': 0}
+    breakdowns = {name: {} for name, _ in REPORT_DIMENSIONS}
+    for group in groups:
+        key = dict(zip(['cardType', 'vendor', 'model', 'machine'], group[:4]))
+        count, amount = group[4], group[5] or 0
+        total['count'] += count
+        total['amount'] += amount
+        for name, column in REPORT_DIMENSIONS:
+            entry = breakdowns[name].setdefault(key[column], {'key': key[column], 'count': 0, 'amount': 0})
+            entry['count'] += count
+            entry['amount'] += amount
+    summary = {'total': total}
+    for name, entries in breakdowns.items():
+        summary[name] = sorted(entries.values(), key=lambda e: e['amount'], reverse=True)
+    return summary
+
+# FROM clause and params for a report. Every filter except free-text search is
+# a rollup dimension or a whole day, so reports normally read sales_daily; with
+# `q` the raw rows are reshaped into the same (day, ..., count, amount) columns.
+def report_source(filters):
+    if (filters.get('q') or '').strip():
+        clauses, params = sales_filter_sql(filters)
+        return f'''(SELECT substr(dateTime, 1, 10) AS day, cardType, vendor, model, machine,
+            1 AS count, amount FROM sales WHERE {' AND '.join(clauses)})''', params
+    
+    clauses = []
+    params = []
     if filters.get('startDate'):
-        query += ' AND dateTime >= ?'
-        params.append(filters['startDate'] + 'T00:00:00')
+        clauses.append('day >= ?')
+        params.append(filters['startDate'])
     if filters.get('endDate'):
-        query += ' AND dateTime <= ?'
-        params.append(filters['endDate'] + 'T23:59:59')
+        clauses.append('day <= ?')
+        params.append(filters['endDate'])
     if filters.get('month'):
-        query += ' AND strftime("%Y-%m", dateTime) = ?'
-        params.append(filters['month'])
+        try:
+            start, end = month_range(filters['month'])
+        except ValueError:
+            raise ValueError('month must be YYYY-MM')
+        clauses.append('day >= ? AND day < ?')
+        params.extend([start, end])
+    for column in ROLLUP_DIMENSIONS:
+        if filters.get(column):
+            clauses.append(f'{column} = ?')
+            params.append(filters[column])
+    source = 'sales_daily'
+    if clauses:
+        source += ' WHERE ' + ' AND '.join(clauses)
+    return source, params
+
+@app.route('/api/reports/summary', methods=['GET'])
+def get_report_summary():
+    conn = get_db()
+    c = conn.cursor()
+    etag = request_etag(table_version(c, 'sales'))
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    
+    try:
+        source, params = report_source(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    # The few hundred groups are folded into every breakdown in Python
+    c.execute(f'''SELECT cardType, vendor, model, machine, SUM(count), SUM(amount)
+        FROM {source} GROUP BY cardType, vendor, model, machine''', params)
+    
+    return with_etag(jsonify({'success': True, 'data': summarize_groups(c.fetchall())}), etag)
+
+@app.route('/api/reports/monthly', methods=['GET'])
+def get_report_monthly():
+    conn = get_db()
+    c = conn.cursor()
+    etag = request_etag(table_version(c, 'sales'))
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    
+    try:
+        source, params = report_source(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     
-    query += ' ORDER BY dateTime DESC'
+    c.execute(f'''SELECT substr(day, 1, 7), SUM(count), SUM(amount)
+        FROM {source} GROUP BY 1 ORDER BY 1 DESC''', params)
+    months = [{'month': row[0], 'count': row[1], 'amount': row[2]} for row in c.fetchall()]
+    return with_etag(jsonify({'success': True, 'data': months}), etag)
+
+EXPORT_HEADER = ['ID', 'Date Time', 'Card Number', 'Card Type', 'Machine', 'Vendor', 'Model', 'Amount', 'Type']
+EXPORT_BATCH_SIZE = 5000
+
+# Yield filtered sales rows in fetchmany batches, newest first, so exports never
+# hold the whole result set in memory
+def iter_sales_batches(clauses, params):
+    query = 'SELECT * FROM sales'
+    if clauses:
+        query += ' WHERE ' + ' AND '.join(clauses)
+    query += ' ORDER BY dateTime DESC, id DESC'
     
+    c = get_db().cursor()
     c.execute(query, params)
-    rows = c.fetchall()
-    conn.close()
+    try:
+        while True:
+            rows = c.fetchmany(EXPORT_BATCH_SIZE)
+            if not rows:
+                break
+            yield rows
+    finally:
+        c.close()
+
+def export_filename(extension):
+    return f'sales_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{extension}'
+
+@app.route('/api/export/csv', methods=['POST'])
+def export_csv():
+    data = request.json
+    filters = data.get('filters', {})
     
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(['ID', 'Date Time', 'Card Number', 'Card Type', 'Machine', 'Vendor', 'Model', 'Amount', 'Type'])
+    try:
+        clauses, params = sales_filter_sql(filters)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     
-    for row in rows:
-        writer.writerow(row)
+    def generate():
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(EXPORT_HEADER)
+        yield output.getvalue()
+        
+        for rows in iter_sales_batches(clauses, params):
+            output.seek(0)
+            output.truncate()
+            writer.writerows(rows)
+            yield output.getvalue()
     
-    output.seek(0)
-    return output.getvalue(), 200, {
-        'Content-Type': 'text/csv',
-        'Content-Disposition': f'attachment; filename=sales_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
-    }
+    return Response(stream_with_context(generate()), mimetype='text/csv', headers={
+        'Content-Disposition': f'attachment; filename={export_filename("csv")}'
+    })
+
+# Minimal SpreadsheetML package; the single worksheet is streamed separately
+XLSX_PARTS = [
+    ('[Content_Types].xml', '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'),
+    ('_rels/.rels', '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'),
+    ('xl/workbook.xml', '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Sales" sheetId="1" r:id="rId1"/></sheets></workbook>'),
+    ('xl/_rels/workbook.xml.rels', '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'),
+]
+XLSX_COLUMNS = 'ABCDEFGHI'
+XLSX_INVALID_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+# Write-only sink for ZipFile: collects compressed output until the response
+# generator takes it. Being unseekable makes zipfile use data descriptors.
+class ChunkSink(io.RawIOBase):
+    def __init__(self):
+        self.chunks = []
+    
+    def writable(self):
+        return True
+    
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+    
+    def take(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def xlsx_row(number, values):
+    cells = []
+    for col, value in zip(XLSX_COLUMNS, values):
+        ref = f'{col}{number}'
+        if value is None:
+            continue
+        if isinstance(value, (int, float)):
+            cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+        else:
+            text = xml_escape(XLSX_INVALID_CHARS.sub('', str(value)))
+            cells.append(f'<c r="{ref}" t="inlineStr"><is><t>{text}</t></is></c>')
+    return f'<row r="{number}">' + ''.join(cells) + '</row>'
+
+@app.route('/api/export/xlsx', methods=['POST'])
+def export_xlsx():
+    data = request.json or {}
+    filters = data.get('filters', {})
+    
+    try:
+        clauses, params = sales_filter_sql(filters)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    def generate():
+        sink = ChunkSink()
+        with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for name, xml in XLSX_PARTS:
+                zf.writestr(name, xml)
+            yield sink.take()
+            
+            # Inline strings avoid a shared-strings table that grows with the data
+            with zf.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+                sheet.write(('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                             '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                             '<sheetData>' + xlsx_row(1, EXPORT_HEADER)).encode())
+                number = 1
+                for rows in iter_sales_batches(clauses, params):
+                    parts = []
+                    for row in rows:
+                        number += 1
+                        parts.append(xlsx_row(number, row))
+                    sheet.write(''.join(parts).encode())
+                    yield sink.take()
+                sheet.write(b'</sheetData></worksheet>')
+        yield sink.take()
+    
+    return Response(stream_with_context(generate()),
+                    mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                    headers={'Content-Disposition': f'attachment; filename={export_filename("xlsx")}'})
+
+# Sales import: CSV or XLSX files are read row by row, mapped onto the sales
+# columns by header name, then validated and committed IMPORT_BATCH_SIZE rows
+# at a time. Each commit also advances the job's row count in `imports`, so a
+# failed import resumes after the last committed batch. Uploads return the
+# job at once and are processed by a background thread of the worker.
+IMPORT_BATCH_SIZE = 5000
+IMPORT_MAX_ERRORS = 100
+IMPORT_STALE_SECONDS = 120   # a running job not updated for this long is taken as dead
+XLSX_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+EXCEL_EPOCH = datetime(1899, 12, 30)
+
+def import_columns(header):
+    names = {re.sub('[^a-z0-9]', '', col.lower()): col for col in SALES_COLUMNS}
+    mapping = [names.get(re.sub('[^a-z0-9]', '', str(cell or '').lower())) for cell in header or []]
+    missing = [col for col in SALES_COLUMNS[1:] if col not in mapping]
+    if missing:
+        raise ValueError('Missing columns: ' + ', '.join(missing))
+    return mapping
+
+def import_value(col, value):
+    if isinstance(value, str):
+        value = value.strip()
+        if not value:
+            return None
+        if col == 'amount':
+            try:
+                return float(value.replace(',', ''))
+            except ValueError:
+                return value
+        return value
+    if isinstance(value, float) and col != 'amount':
+        # Spreadsheet numbers: dates are day serials, card numbers and ids integers
+        if col == 'dateTime':
+            return (EXCEL_EPOCH + timedelta(days=value)).isoformat(timespec='minutes')
+        if value.is_integer():
+            return str(int(value))
+    return value
+
+def iter_csv_rows(stream):
+    yield from csv.reader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+
+def xlsx_strings(zf):
+    if 'xl/sharedStrings.xml' not in zf.namelist():
+        return []
+    strings = []
+    with zf.open('xl/sharedStrings.xml') as part:
+        for _, elem in iterparse(part):
+            if elem.tag == XLSX_NS + 'si':
+                strings.append(''.join(t.text or '' for t in elem.iter(XLSX_NS + 't')))
+                elem.clear()
+    return strings
+
+def xlsx_column(ref):
+    index = 0
+    for char in ref:
+        if not char.isalpha():
+            break
+        index = index * 26 + ord(char.upper()) - 64
+    return index - 1
+
+# Rows of the first worksheet; rows are cleared as they are read, so only the
+# shared strings table stays in memory
+def iter_xlsx_rows(file):
+    with zipfile.ZipFile(file) as zf:
+        strings = xlsx_strings(zf)
+        sheets = sorted((n for n in zf.namelist() if re.fullmatch(r'xl/worksheets/sheet\d+\.xml', n)),
+                        key=lambda n: int(re.search(r'\d+', n.rsplit('/', 1)[1]).group()))
+        if not sheets:
+            raise ValueError('No worksheet found')
+        with zf.open(sheets[0]) as part:
+            sheet_data = None
+            for event, elem in iterparse(part, events=('start', 'end')):
+                if event == 'start':
+                    if elem.tag == XLSX_NS + 'sheetData':
+                        sheet_data = elem
+                    continue
+                if elem.tag != XLSX_NS + 'row':
+                    continue
+                values = []
+                for cell in elem.iter(XLSX_NS + 'c'):
+                    col = xlsx_column(cell.get('r', '')) if cell.get('r') else len(values)
+                    values.extend([None] * (col - len(values)))
+                    kind = cell.get('t')
+                    v = cell.find(XLSX_NS + 'v')
+                    if kind == 'inlineStr':
+                        value = ''.join(t.text or '' for t in cell.iter(XLSX_NS + 't'))
+                    elif v is None or v.text is None:
+                        value = None
+                    elif kind == 's':
+                        value = strings[int(v.text)]
+                    elif kind in ('str', 'e'):
+                        value = v.text
+                    elif kind == 'b':
+                        value = v.text == '1'
+                    else:
+                        value = float(v.text)
+                    values.append(value)
+                yield values
+                if sheet_data is not None:
+                    sheet_data.clear()
+
+# Column mapping from the header row, and the data rows after it
+def import_rows(file, fmt):
+    if fmt != 'xlsx':
+        rows = iter_csv_rows(file)
+        return import_columns(next(rows, None)), rows
+    rows = iter_xlsx_rows(file)
+    try:
+        header = next(rows, None)
+    except (zipfile.BadZipFile, ParseError) as e:
+        raise ValueError(f'Not a valid XLSX file ({e})')
+    return import_columns(header), rows
+
+IMPORT_JOB_COLUMNS = 'id, name, format, status, rows, inserted, failed, errors, error, started_at, updated_at'
+
+def import_job_dict(row):
+    keys = ['id', 'name', 'format', 'status', 'rows', 'inserted', 'failed', 'errors', 'error', 'startedAt', 'updatedAt']
+    job = dict(zip(keys, row))
+    job['errors'] = json.loads(job['errors'])
+    return job
+
+def import_job(c, job_id):
+    c.execute(f'SELECT {IMPORT_JOB_COLUMNS} FROM imports WHERE id = ?', (job_id,))
+    row = c.fetchone()
+    return import_job_dict(row) if row else None
+
+def save_import_job(c, job):
+    job['updatedAt'] = datetime.now().isoformat(timespec='seconds')
+    c.execute('''UPDATE imports SET status = ?, rows = ?, inserted = ?, failed = ?, errors = ?,
+        error = ?, updated_at = ? WHERE id = ?''', (
+        job['status'], job['rows'], job['inserted'], job['failed'], json.dumps(job['errors']),
+        job['error'], job['updatedAt'], job['id']))
+
+def import_stale(job):
+    updated = datetime.fromisoformat(job['updatedAt'])
+    return (datetime.now() - updated).total_seconds() > IMPORT_STALE_SECONDS
+
+# Create a queued import job, or requeue `resume` to continue after its last
+# committed batch. A job another worker is still running cannot be resumed.
+def open_import_job(conn, name, fmt, resume=None):
+    c = conn.cursor()
+    c.execute('BEGIN IMMEDIATE')
+    try:
+        if resume:
+            job = import_job(c, resume)
+            if job is None:
+                raise ValueError(f'Unknown import {resume}')
+            if job['status'] == 'done':
+                raise ValueError(f'Import {resume} is already done')
+            if job['status'] in ('queued', 'running') and not import_stale(job):
+                raise ValueError(f'Import {resume} is still running')
+            job.update(status='queued', error=None)
+            save_import_job(c, job)
+        else:
+            now = datetime.now().isoformat(timespec='seconds')
+            c.execute("INSERT INTO imports (name, format, status, started_at, updated_at) VALUES (?,?,'queued',?,?)",
+                      (name, fmt, now, now))
+            job = import_job(c, c.lastrowid)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return job
+
+# Run an opened job over the data `rows` (see import_rows). `progress` is
+# called with the job after every committed batch.
+def import_sales(conn, job, mapping, rows, progress=None):
+    c = conn.cursor()
+    job.update(status='running', error=None)
+    save_import_job(c, job)
+    conn.commit()
+    skip = job['rows']
+    
+    def commit_batch(batch):
+        c.execute('BEGIN IMMEDIATE')
+        numbers, records = [], []
+        for number, values in batch:
+            record = {col: import_value(col, value) for col, value in zip(mapping, values) if col}
+            if all(value is None for value in record.values()):
+                continue
+            if record.get('id') is None:
+                record['id'] = f"import-{job['id']}-{number}"
+            numbers.append(number)
+            records.append(record)
+        sales, results = validate_sales_batch(c, records)
+        insert_sales(c, sales)
+        record_changes(c, 'sales', 'upsert', [sale[0] for sale in sales])
+        for number, result in zip(numbers, results):
+            if not result['success'] and len(job['errors']) < IMPORT_MAX_ERRORS:
+                job['errors'].append({'row': number, 'id': result['id'], 'error': result['error']})
+        job['rows'] += len(batch)
+        job['inserted'] += len(sales)
+        job['failed'] += len(records) - len(sales)
+        save_import_job(c, job)
+        conn.commit()
+        if progress:
+            progress(job)
+    
+    # A failure keeps every committed batch; the job records where to resume
+    try:
+        batch = []
+        for number, values in enumerate(rows, start=2):
+            if number - 1 <= skip:
+                continue
+            batch.append((number, values))
+            if len(batch) == IMPORT_BATCH_SIZE:
+                commit_batch(batch)
+                batch = []
+        if batch:
+            commit_batch(batch)
+        job['status'] = 'done'
+    except Exception as e:
+        app.logger.exception('Sales import %s failed', job['id'])
+        conn.rollback()
+        job.update(status='failed', error=str(e))
+    save_import_job(c, job)
+    conn.commit()
+    return job
+
+def import_format(fmt, filename):
+    fmt = (fmt or os.path.splitext(filename or '')[1].lstrip('.') or 'csv').lower()
+    if fmt not in ('csv', 'xlsx'):
+        raise ValueError('format must be csv or xlsx')
+    return fmt
+
+def run_import(job, mapping, rows, spool):
+    with app.app_context():
+        conn = connect_db()
+        try:
+            import_sales(conn, job, mapping, rows)
+        finally:
+            conn.close()
+            spool.close()
+
+# Upload as multipart `file` or as the raw request body. The header is checked
+# here; the rows are imported in the background from a copy of the upload, and
+# the response is 202 with the job to poll at its Location.
+@app.route('/api/import/sales', methods=['POST'])
+def import_sales_upload():
+    upload = request.files.get('file')
+    if not upload and request.mimetype in ('application/x-www-form-urlencoded', 'multipart/form-data'):
+        return jsonify({'success': False, 'error': 'Send the file as the multipart field "file", '
+                        'or as the raw request body with a CSV or XLSX content type'}), 400
+    name = upload.filename if upload else request.args.get('name')
+    try:
+        fmt = import_format(request.args.get('format'), name)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    spool = tempfile.TemporaryFile()
+    try:
+        shutil.copyfileobj(upload.stream if upload else request.stream, spool)
+        spool.seek(0)
+        mapping, rows = import_rows(spool, fmt)
+        job = open_import_job(get_db(), name, fmt, resume=request.args.get('resume', type=int))
+    except (ValueError, csv.Error, zipfile.BadZipFile) as e:
+        spool.close()
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception:
+        spool.close()
+        raise
+    
+    threading.Thread(target=run_import, args=(job, mapping, rows, spool), daemon=True).start()
+    response = jsonify({'success': True, 'import': job})
+    response.status_code = 202
+    response.headers['Location'] = f"/api/import/sales/{job['id']}"
+    return response
+
+# Imports that are not done: queued, running, or failed and waiting for a resume
+@app.route('/api/import/sales', methods=['GET'])
+def list_imports():
+    c = get_db().cursor()
+    c.execute(f"SELECT {IMPORT_JOB_COLUMNS} FROM imports WHERE status != 'done' ORDER BY id DESC")
+    jobs = [import_job_dict(row) for row in c.fetchall()]
+    for job in jobs:
+        job['stale'] = job['status'] in ('queued', 'running') and import_stale(job)
+    return jsonify({'success': True, 'imports': jobs})
+
+@app.route('/api/import/sales/<int:job_id>', methods=['GET'])
+def get_import(job_id):
+    job = import_job(get_db().cursor(), job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Import not found'}), 404
+    return jsonify({'success': True, 'import': job})
+
+@app.cli.command('import-sales')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', help='csv or xlsx (default: from the file extension)')
+@click.option('--resume', type=int, help='Continue the import with this id after its last committed batch')
+def import_sales_command(path, fmt, resume):
+    """Import sales from a CSV or XLSX file."""
+    try:
+        fmt = import_format(fmt, path)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--format')
+    
+    def progress(job):
+        print(f"import {job['id']}: {job['rows']} rows, {job['inserted']} inserted, {job['failed']} failed")
+    
+    with open(path, 'rb') as file:
+        try:
+            mapping, rows = import_rows(file, fmt)
+            job = open_import_job(get_db(), os.path.basename(path), fmt, resume=resume)
+        except (ValueError, csv.Error, zipfile.BadZipFile) as e:
+            raise click.ClickException(str(e))
+        job = import_sales(get_db(), job, mapping, rows, progress=progress)
+    for error in job['errors']:
+        print(f"  row {error['row']}: {error['error']}")
+    if job['status'] == 'failed':
+        raise click.ClickException(f"import {job['id']} failed after {job['rows']} rows: {job['error']} "
+                                   f"(continue with --resume {job['id']})")
+    print(f"Import {job['id']} done: {job['inserted']} inserted, {job['failed']} failed")
 
 MASTER_EDITOR_TEMPLATE = '''
 <!DOCTYPE html>
@@ -290,194 +2096,7 @@ MASTER_EDITOR_TEMPLATE = '''
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Master Data Editor</title>
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body { 
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; 
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-            min-height: 100vh; 
-            padding: 20px; 
-        }
-        .container { 
-            max-width: 1400px; 
-            margin: 0 auto; 
-            background: white; 
-            border-radius: 20px; 
-            box-shadow: 0 20px 60px rgba(0,0,0,0.3); 
-            overflow: hidden; 
-        }
-        .header { 
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-            color: white; 
-            padding: 30px; 
-            text-align: center; 
-            position: relative; 
-        }
-        .header h1 { font-size: 2.5em; margin-bottom: 10px; }
-        .back-btn { 
-            position: absolute; 
-            left: 20px; 
-            top: 50%; 
-            transform: translateY(-50%); 
-            background: rgba(255,255,255,0.2); 
-            color: white; 
-            padding: 10px 20px; 
-            border-radius: 8px; 
-            text-decoration: none; 
-            font-weight: 600;
-            transition: all 0.3s;
-        }
-        .back-btn:hover { background: rgba(255,255,255,0.3); }
-        .content { padding: 30px; }
-        .grid { 
-            display: grid; 
-            grid-template-columns: repeat(auto-fit, minmax(400px, 1fr)); 
-            gap: 30px; 
-        }
-        .section { 
-            background: #f8f9fa; 
-            border-radius: 12px; 
-            padding: 25px; 
-            border: 2px solid #e9ecef;
-        }
-        .section h2 { 
-            color: #333; 
-            margin-bottom: 20px; 
-            display: flex; 
-            align-items: center; 
-            gap: 10px;
-            font-size: 1.3em;
-        }
-        .section-icon { font-size: 1.5em; }
-        .form-group { margin-bottom: 15px; }
-        .form-group label { 
-            display: block; 
-            font-weight: 600; 
-            margin-bottom: 5px; 
-            color: #555; 
-            font-size: 0.9em;
-        }
-        .form-group input, .form-group select { 
-            width: 100%; 
-            padding: 10px; 
-            border: 2px solid #e0e0e0; 
-            border-radius: 6px; 
-            font-size: 14px;
-        }
-        .form-group input:focus, .form-group select:focus { 
-            outline: none; 
-            border-color: #667eea; 
-        }
-        .btn { 
-            padding: 10px 20px; 
-            border: none; 
-            border-radius: 6px; 
-            font-size: 14px; 
-            font-weight: 600; 
-            cursor: pointer; 
-            transition: all 0.3s; 
-            margin-right: 5px;
-        }
-        .btn-primary { 
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-            color: white; 
-        }
-        .btn-success { background: #28a745; color: white; }
-        .btn-danger { background: #dc3545; color: white; }
-        .btn-warning { background: #ffc107; color: #000; }
-        .btn:hover { transform: translateY(-2px); box-shadow: 0 4px 8px rgba(0,0,0,0.2); }
-        .item-list { 
-            max-height: 300px; 
-            overflow-y: auto; 
-            border: 1px solid #dee2e6; 
-            border-radius: 6px; 
-            background: white;
-            margin-top: 10px;
-        }
-        .item { 
-            display: flex; 
-            justify-content: space-between; 
-            align-items: center; 
-            padding: 10px 15px; 
-            border-bottom: 1px solid #f0f0f0;
-        }
-        .item:last-child { border-bottom: none; }
-        .item:hover { background: #f8f9fa; }
-        .item-info { font-weight: 500; color: #333; }
-        .item-sub { font-size: 0.85em; color: #666; }
-        .item-actions { display: flex; gap: 5px; }
-        .btn-small { padding: 5px 10px; font-size: 12px; }
-        .add-form { 
-            display: flex; 
-            gap: 10px; 
-            margin-bottom: 15px; 
-            flex-wrap: wrap;
-        }
-        .add-form input { flex: 1; min-width: 120px; }
-        .save-all-btn { 
-            position: fixed; 
-            bottom: 30px; 
-            right: 30px; 
-            padding: 15px 30px; 
-            font-size: 16px; 
-            border-radius: 50px;
-            box-shadow: 0 4px 15px rgba(102, 126, 234, 0.4);
-            z-index: 1000;
-        }
-        .alert { 
-            padding: 15px; 
-            border-radius: 8px; 
-            margin-bottom: 20px; 
-            display: none; 
-        }
-        .alert-success { 
-            background: #d4edda; 
-            color: #155724; 
-            border: 1px solid #c3e6cb; 
-            display: block; 
-        }
-        .alert-error { 
-            background: #f8d7da; 
-            color: #721c24; 
-            border: 1px solid #f5c6cb; 
-            display: block; 
-        }
-        .stats { 
-            display: flex; 
-            gap: 20px; 
-            margin-bottom: 20px; 
-            flex-wrap: wrap;
-        }
-        .stat-item { 
-            background: white; 
-            padding: 15px 20px; 
-            border-radius: 8px; 
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }
-        .stat-value { 
-            font-size: 1.5em; 
-            font-weight: bold; 
-            color: #667eea; 
-        }
-        .stat-label { 
-            font-size: 0.85em; 
-            color: #666; 
-            text-transform: uppercase;
-        }
-        .info-message { 
-            background: #d1ecf1; 
-            color: #0c5460; 
-            padding: 8px 12px; 
-            border-radius: 4px; 
-            font-size: 0.85em; 
-            margin-bottom: 10px;
-            border: 1px solid #bee5eb;
-        }
-        @media (max-width: 768px) { 
-            .grid { grid-template-columns: 1fr; }
-            .header h1 { font-size: 1.5em; }
-        }
-    </style>
+    <link rel="stylesheet" href="{{ assets['editor.css'] }}">
 </head>
 <body>
     <div class="container">
@@ -564,252 +2183,7 @@ MASTER_EDITOR_TEMPLATE = '''
 
     <button class="btn btn-primary save-all-btn" onclick="saveAllData()">💾 Save All Changes</button>
 
-    <script>
-        let masterData = {
-            cards: [],
-            machines: [],
-            vendors: [],
-            models: []
-        };
-
-        document.addEventListener('DOMContentLoaded', function() {
-            loadMasterData();
-        });
-
-        async function loadMasterData() {
-            try {
-                const response = await fetch('/api/master-data');
-                const result = await response.json();
-                masterData = result.data;
-                renderAll();
-                updateStats();
-            } catch (error) {
-                showAlert('Failed to load master data: ' + error.message, 'error');
-            }
-        }
-
-        function renderAll() {
-            renderCards();
-            renderMachines();
-            renderVendors();
-            renderModels();
-        }
-
-        function updateStats() {
-            document.getElementById('statCards').textContent = masterData.cards.length;
-            document.getElementById('statMachines').textContent = masterData.machines.length;
-            document.getElementById('statVendors').textContent = masterData.vendors.length;
-            document.getElementById('statModels').textContent = masterData.models.length;
-        }
-
-        function renderCards() {
-            const container = document.getElementById('cardsList');
-            container.innerHTML = '';
-            
-            masterData.cards.forEach((card, index) => {
-                const div = document.createElement('div');
-                div.className = 'item';
-                div.innerHTML = `
-                    <div>
-                        <div class="item-info">${card.number}</div>
-                        <div class="item-sub">${card.type}</div>
-                    </div>
-                    <div class="item-actions">
-                        <button class="btn btn-danger btn-small" onclick="deleteCard(${index})">Delete</button>
-                    </div>
-                `;
-                container.appendChild(div);
-            });
-        }
-
-        function renderMachines() {
-            const container = document.getElementById('machinesList');
-            container.innerHTML = '';
-            
-            masterData.machines.forEach((machine, index) => {
-                const div = document.createElement('div');
-                div.className = 'item';
-                div.innerHTML = `
-                    <div class="item-info">${machine}</div>
-                    <div class="item-actions">
-                        <button class="btn btn-danger btn-small" onclick="deleteMachine(${index})">Delete</button>
-                    </div>
-                `;
-                container.appendChild(div);
-            });
-        }
-
-        function renderVendors() {
-            const container = document.getElementById('vendorsList');
-            container.innerHTML = '';
-            
-            masterData.vendors.forEach((vendor, index) => {
-                const div = document.createElement('div');
-                div.className = 'item';
-                div.innerHTML = `
-                    <div class="item-info">${vendor}</div>
-                    <div class="item-actions">
-                        <button class="btn btn-danger btn-small" onclick="deleteVendor(${index})">Delete</button>
-                    </div>
-                `;
-                container.appendChild(div);
-            });
-        }
-
-        function renderModels() {
-            const container = document.getElementById('modelsList');
-            container.innerHTML = '';
-            
-            masterData.models.forEach((model, index) => {
-                const div = document.createElement('div');
-                div.className = 'item';
-                div.innerHTML = `
-                    <div class="item-info">${model}</div>
-                    <div class="item-actions">
-                        <button class="btn btn-danger btn-small" onclick="deleteModel(${index})">Delete</button>
-                    </div>
-                `;
-                container.appendChild(div);
-            });
-        }
-
-        function addCard() {
-            const number = document.getElementById('newCardNumber').value.trim();
-            const type = document.getElementById('newCardType').value;
-            
-            if (!number || !type) {
-                showAlert('Please enter both card number and type', 'error');
-                return;
-            }
-            
-            // No duplicate check - allow same number with same type
-            masterData.cards.push({ number, type });
-            masterData.cards.sort((a, b) => {
-                if (a.number !== b.number) return a.number.localeCompare(b.number);
-                return a.type.localeCompare(b.type);
-            });
-            
-            document.getElementById('newCardNumber').value = '';
-            document.getElementById('newCardType').value = '';
-            
-            renderCards();
-            updateStats();
-            showAlert('Card added! Click "Save All Changes" to persist.', 'success');
-        }
-
-        function addMachine() {
-            const name = document.getElementById('newMachine').value.trim();
-            if (!name) return;
-            
-            if (masterData.machines.includes(name)) {
-                showAlert('Machine already exists', 'error');
-                return;
-            }
-            
-            masterData.machines.push(name);
-            masterData.machines.sort();
-            
-            document.getElementById('newMachine').value = '';
-            renderMachines();
-            updateStats();
-            showAlert('Machine added! Click "Save All Changes" to persist.', 'success');
-        }
-
-        function addVendor() {
-            const name = document.getElementById('newVendor').value.trim();
-            if (!name) return;
-            
-            if (masterData.vendors.includes(name)) {
-                showAlert('Vendor already exists', 'error');
-                return;
-            }
-            
-            masterData.vendors.push(name);
-            masterData.vendors.sort();
-            
-            document.getElementById('newVendor').value = '';
-            renderVendors();
-            updateStats();
-            showAlert('Vendor added! Click "Save All Changes" to persist.', 'success');
-        }
-
-        function addModel() {
-            const name = document.getElementById('newModel').value.trim();
-            if (!name) return;
-            
-            if (masterData.models.includes(name)) {
-                showAlert('Model already exists', 'error');
-                return;
-            }
-            
-            masterData.models.push(name);
-            masterData.models.sort();
-            
-            document.getElementById('newModel').value = '';
-            renderModels();
-            updateStats();
-            showAlert('Model added! Click "Save All Changes" to persist.', 'success');
-        }
-
-        function deleteCard(index) {
-            if (!confirm('Delete this card?')) return;
-            masterData.cards.splice(index, 1);
-            renderCards();
-            updateStats();
-            showAlert('Card deleted! Click "Save All Changes" to persist.', 'success');
-        }
-
-        function deleteMachine(index) {
-            if (!confirm('Delete this machine?')) return;
-            masterData.machines.splice(index, 1);
-            renderMachines();
-            updateStats();
-            showAlert('Machine deleted! Click "Save All Changes" to persist.', 'success');
-        }
-
-        function deleteVendor(index) {
-            if (!confirm('Delete this vendor?')) return;
-            masterData.vendors.splice(index, 1);
-            renderVendors();
-            updateStats();
-            showAlert('Vendor deleted! Click "Save All Changes" to persist.', 'success');
-        }
-
-        function deleteModel(index) {
-            if (!confirm('Delete this model?')) return;
-            masterData.models.splice(index, 1);
-            renderModels();
-            updateStats();
-            showAlert('Model deleted! Click "Save All Changes" to persist.', 'success');
-        }
-
-        async function saveAllData() {
-            try {
-                const response = await fetch('/api/master-data', {
-                    method: 'POST',
-                    headers: {'Content-Type': 'application/json'},
-                    body: JSON.stringify(masterData)
-                });
-                
-                const result = await response.json();
-                if (result.success) {
-                    showAlert('All changes saved successfully! Redirecting...', 'success');
-                    setTimeout(() => window.location.href = '/', 1500);
-                } else {
-                    showAlert('Error saving data: ' + result.error, 'error');
-                }
-            } catch (error) {
-                showAlert('Save failed: ' + error.message, 'error');
-            }
-        }
-
-        function showAlert(message, type) {
-            const alert = document.getElementById('alertBox');
-            alert.textContent = message;
-            alert.className = 'alert alert-' + type;
-            setTimeout(() => alert.className = 'alert', 5000);
-        }
-    </script>
+    <script src="{{ assets['editor.js'] }}"></script>
 </body>
 </html>
 '''
@@ -821,122 +2195,7 @@ HTML_TEMPLATE = '''
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Mobile Sales Tracker</title>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/xlsx/0.18.5/xlsx.full.min.js"></script>
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); min-height: 100vh; padding: 20px; }
-        .container { max-width: 1600px; margin: 0 auto; background: white; border-radius: 20px; box-shadow: 0 20px 60px rgba(0,0,0,0.3); overflow: hidden; }
-        .header { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; text-align: center; position: relative; }
-        .header h1 { font-size: 2.5em; margin-bottom: 10px; }
-        .master-data-btn { 
-            position: absolute; 
-            right: 20px; 
-            top: 50%; 
-            transform: translateY(-50%); 
-            background: rgba(255,255,255,0.9); 
-            color: #667eea; 
-            padding: 10px 20px; 
-            border-radius: 8px; 
-            text-decoration: none; 
-            font-weight: 600;
-            transition: all 0.3s;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.2);
-        }
-        .master-data-btn:hover { 
-            background: white; 
-            transform: translateY(-50%) scale(1.05); 
-        }
-        .tabs { display: flex; background: #f8f9fa; border-bottom: 2px solid #dee2e6; flex-wrap: wrap; }
-        .tab { flex: 1; padding: 15px; text-align: center; cursor: pointer; transition: all 0.3s; font-weight: 600; color: #666; min-width: 120px; }
-        .tab.active { background: white; color: #667eea; border-bottom: 3px solid #667eea; }
-        .tab:hover:not(.active) { background: #e9ecef; }
-        .content { padding: 30px; display: none; }
-        .content.active { display: block; }
-        .form-grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(300px, 1fr)); gap: 20px; margin-bottom: 30px; }
-        .form-group { display: flex; flex-direction: column; position: relative; }
-        .form-group label { font-weight: 600; margin-bottom: 8px; color: #333; font-size: 0.9em; text-transform: uppercase; letter-spacing: 0.5px; }
-        .form-group input, .form-group select { padding: 12px; border: 2px solid #e0e0e0; border-radius: 8px; font-size: 16px; transition: all 0.3s; }
-        .form-group input:focus, .form-group select:focus { outline: none; border-color: #667eea; box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1); }
-        .card-status-badge { position: absolute; right: 10px; top: 50%; transform: translateY(-50%); padding: 4px 8px; border-radius: 4px; font-size: 0.75em; font-weight: bold; display: none; }
-        .card-valid { background: #d4edda; color: #155724; border: 1px solid #c3e6cb; }
-        .card-invalid { background: #f8d7da; color: #721c24; border: 1px solid #f5c6cb; }
-        .card-used { background: #fff3cd; color: #856404; border: 1px solid #ffeaa7; }
-        .btn { padding: 12px 30px; border: none; border-radius: 8px; font-size: 16px; font-weight: 600; cursor: pointer; transition: all 0.3s; text-transform: uppercase; letter-spacing: 0.5px; margin-right: 10px; margin-bottom: 10px; }
-        .btn-primary { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; }
-        .btn-success { background: #28a745; color: white; }
-        .btn-danger { background: #dc3545; color: white; }
-        .btn-warning { background: #ffc107; color: #000; }
-        .btn-secondary { background: #6c757d; color: white; }
-        .btn-info { background: #17a2b8; color: white; }
-        .btn:disabled { background: #ccc; cursor: not-allowed; }
-        .table-container { overflow-x: auto; margin-top: 30px; border-radius: 8px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
-        table { width: 100%; border-collapse: collapse; background: white; }
-        th { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 15px; text-align: left; font-weight: 600; text-transform: uppercase; font-size: 0.85em; letter-spacing: 0.5px; }
-        td { padding: 12px 15px; border-bottom: 1px solid #dee2e6; }
-        tr:hover { background: #f8f9fa; }
-        tr.card-group-start { border-top: 2px solid #667eea; }
-        tr.transaction-row { background: #fafbfc; }
-        tr.selected { background: #fff3cd !important; }
-        .stats-grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 20px; margin-bottom: 30px; }
-        .stat-card { background: white; padding: 25px; border-radius: 12px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); border-left: 4px solid #667eea; }
-        .stat-card h3 { color: #666; font-size: 0.9em; text-transform: uppercase; margin-bottom: 10px; }
-        .stat-number { font-size: 2.5em; font-weight: bold; color: #333; }
-        .card-status { display: inline-block; padding: 4px 12px; border-radius: 20px; font-size: 0.85em; font-weight: 600; }
-        .status-used { background: #dc3545; color: white; }
-        .status-available { background: #28a745; color: white; }
-        .alert { padding: 15px; border-radius: 8px; margin-bottom: 20px; display: none; }
-        .alert-success { background: #d4edda; color: #155724; border: 1px solid #c3e6cb; display: block; }
-        .alert-error { background: #f8d7da; color: #721c24; border: 1px solid #f5c6cb; display: block; }
-        .filter-box { margin-bottom: 15px; padding: 15px; background: #f0f8ff; border-radius: 8px; border-left: 4px solid #667eea; }
-        .filter-row { background: #f8f9fa; }
-        .filter-row td { padding: 8px; border-bottom: 2px solid #dee2e6; }
-        .column-filter { width: 100%; padding: 6px; border: 1px solid #ced4da; border-radius: 4px; font-size: 0.85em; background: white; }
-        .filter-label { font-size: 0.75em; color: #666; margin-bottom: 2px; display: block; }
-        .search-box { margin-bottom: 20px; display: flex; gap: 10px; flex-wrap: wrap; }
-        .search-box input { flex: 1; min-width: 200px; padding: 12px; border: 2px solid #e0e0e0; border-radius: 8px; font-size: 16px; }
-        .date-filter { display: flex; gap: 10px; margin-bottom: 20px; flex-wrap: wrap; align-items: center; }
-        .inventory-tag { display: inline-block; padding: 2px 8px; border-radius: 4px; font-size: 0.8em; margin-right: 5px; font-weight: 600; background: #e3f2fd; color: #1976d2; }
-        .clear-filters-btn { margin-bottom: 15px; padding: 8px 16px; font-size: 14px; }
-        .export-section { background: #f8f9fa; padding: 20px; border-radius: 8px; margin-bottom: 20px; border: 2px solid #dee2e6; }
-        .export-section h3 { margin-bottom: 15px; color: #333; }
-        .export-options { display: flex; gap: 15px; flex-wrap: wrap; align-items: end; }
-        .modal { display: none; position: fixed; z-index: 1000; left: 0; top: 0; width: 100%; height: 100%; background-color: rgba(0,0,0,0.5); }
-        .modal-content { background-color: white; margin: 5% auto; padding: 30px; border-radius: 12px; width: 90%; max-width: 800px; max-height: 80vh; overflow-y: auto; box-shadow: 0 10px 40px rgba(0,0,0,0.3); }
-        .modal-header { display: flex; justify-content: space-between; align-items: center; margin-bottom: 20px; padding-bottom: 15px; border-bottom: 2px solid #dee2e6; }
-        .modal-header h2 { margin: 0; color: #333; }
-        .close { color: #aaa; font-size: 28px; font-weight: bold; cursor: pointer; }
-        .close:hover { color: #000; }
-        .action-btns { display: flex; gap: 5px; }
-        .action-btns .btn { padding: 6px 12px; font-size: 12px; margin: 0; }
-        .validation-error { color: #dc3545; font-size: 0.85em; margin-top: 5px; display: none; }
-        
-        /* Bulk Delete Styles */
-        .bulk-delete-bar { 
-            background: #fff3cd; 
-            border: 2px solid #ffc107; 
-            border-radius: 8px; 
-            padding: 15px; 
-            margin-bottom: 20px; 
-            display: none; 
-            align-items: center; 
-            justify-content: space-between;
-            flex-wrap: wrap;
-            gap: 10px;
-        }
-        .bulk-delete-bar.active { display: flex; }
-        .bulk-delete-info { font-weight: 600; color: #856404; }
-        .bulk-delete-actions { display: flex; gap: 10px; }
-        .checkbox-cell { width: 40px; text-align: center; }
-        .checkbox-cell input[type="checkbox"] { width: 18px; height: 18px; cursor: pointer; }
-        .select-all-checkbox { width: 18px; height: 18px; cursor: pointer; }
-        .bulk-btn { padding: 8px 16px; font-size: 14px; }
-        @media (max-width: 768px) { 
-            .form-grid { grid-template-columns: 1fr; } 
-            .header h1 { font-size: 1.8em; } 
-            .master-data-btn { position: static; transform: none; margin-top: 15px; display: inline-block; }
-            .bulk-delete-bar { flex-direction: column; align-items: flex-start; }
-        }
-    </style>
+    <link rel="stylesheet" href="{{ assets['app.css'] }}">
 </head>
 <body>
     <div class="container">
@@ -1079,7 +2338,7 @@ HTML_TEMPLATE = '''
             
             <button class="btn btn-success" onclick="loadSales()">🔄 Refresh Data</button>
             
-            <div class="table-container">
+            <div class="table-container virtual-scroll">
                 <table id="recordsTable">
                     <thead>
                         <tr>
@@ -1129,7 +2388,7 @@ HTML_TEMPLATE = '''
                 <input type="text" id="searchCards" placeholder="Search card number, vendor, model..." onkeyup="searchInventoryTable()">
             </div>
 
-            <div class="table-container">
+            <div class="table-container virtual-scroll">
                 <table id="inventoryTable">
                     <thead>
                         <tr>
@@ -1177,6 +2436,13 @@ HTML_TEMPLATE = '''
 
         <!-- Reports Tab -->
         <div id="reports" class="content">
+            <div class="date-filter">
+                <label><strong>Report Period:</strong></label>
+                <input type="date" id="reportStartDate" onchange="loadReports()">
+                <span>to</span>
+                <input type="date" id="reportEndDate" onchange="loadReports()">
+                <button class="btn btn-secondary" onclick="clearReportDates()" style="padding: 8px 15px; font-size: 14px;">Clear</button>
+            </div>
             <div class="stats-grid" id="reportStats"></div>
             <div class="table-container" id="reportTables"></div>
         </div>
@@ -1253,781 +2519,7 @@ HTML_TEMPLATE = '''
         </div>
     </div>
 
-    <script>
-        let salesData = [];
-        let inventoryData = [];
-        let comparisonData = [];
-        let masterData = {};
-        let currentCardTypes = [];
-        let selectedRecords = new Set();
-
-        document.addEventListener('DOMContentLoaded', function() {
-            setCurrentDateTime();
-            setInterval(setCurrentDateTime, 60000);
-            loadMasterData();
-            syncData();
-            
-            const today = new Date().toISOString().split('T')[0];
-            document.getElementById('endDate').value = today;
-            
-            const currentMonth = new Date().toISOString().slice(0, 7);
-            document.getElementById('exportMonth').value = currentMonth;
-        });
-
-        async function loadMasterData() {
-            try {
-                const response = await fetch('/api/master-data');
-                const result = await response.json();
-                masterData = result.data;
-                populateCardTypeDropdown();
-            } catch (error) {
-                console.error('Failed to load master data:', error);
-            }
-        }
-
-        function populateCardTypeDropdown() {
-            const cardTypeSelect = document.getElementById('cardType');
-            const editCardTypeSelect = document.getElementById('editCardType');
-            
-            // Get unique card types from master data
-            const cardTypes = [...new Set(masterData.cards.map(c => c.type))].sort();
-            
-            const options = cardTypes.map(type => `<option value="${type}">${type}</option>`).join('');
-            
-            cardTypeSelect.innerHTML = '<option value="">Select</option>' + options;
-            editCardTypeSelect.innerHTML = '<option value="">Select</option>' + options;
-        }
-
-        function setCurrentDateTime() {
-            const now = new Date();
-            document.getElementById('dateTime').value = now.toISOString().slice(0, 16);
-        }
-
-        async function syncData() {
-            try {
-                const [salesRes, invRes] = await Promise.all([
-                    fetch('/api/sales'),
-                    fetch('/api/inventory')
-                ]);
-                
-                const salesResult = await salesRes.json();
-                const invResult = await invRes.json();
-                
-                salesData = salesResult.data;
-                inventoryData = invResult.data;
-                
-                document.getElementById('lastSync').textContent = 'Last sync: ' + new Date().toLocaleTimeString();
-                showAlert('Data synced!', 'success');
-                
-                if (document.getElementById('records').classList.contains('active')) loadSales();
-                if (document.getElementById('inventory').classList.contains('active')) loadInventory();
-                if (document.getElementById('reports').classList.contains('active')) loadReports();
-                
-            } catch (error) {
-                showAlert('Sync failed: ' + error.message, 'error');
-            }
-        }
-
-        function showTab(tabName) {
-            document.querySelectorAll('.content').forEach(c => c.classList.remove('active'));
-            document.querySelectorAll('.tab').forEach(t => t.classList.remove('active'));
-            document.getElementById(tabName).classList.add('active');
-            event.target.classList.add('active');
-            
-            if (tabName === 'records') loadSales();
-            if (tabName === 'inventory') loadInventory();
-            if (tabName === 'reports') loadReports();
-        }
-
-        async function checkCard() {
-            const num = document.getElementById('cardNumber').value.trim();
-            const badge = document.getElementById('cardValidationBadge');
-            const cardError = document.getElementById('cardError');
-            const cardTypeSelect = document.getElementById('cardType');
-            const submitBtn = document.getElementById('submitBtn');
-            
-            if (!num) {
-                badge.style.display = 'none';
-                cardError.style.display = 'none';
-                submitBtn.disabled = true;
-                return;
-            }
-            
-            try {
-                const response = await fetch(`/api/validate-card/${encodeURIComponent(num)}`);
-                const result = await response.json();
-                
-                if (result.exists) {
-                    currentCardTypes = result.types;
-                    
-                    // Populate card type dropdown with available types for this card
-                    const options = result.types.map(type => `<option value="${type}">${type}</option>`).join('');
-                    cardTypeSelect.innerHTML = '<option value="">Select</option>' + options;
-                    
-                    // AUTO-SELECT: If only one card type exists, select it automatically
-                    if (result.types.length === 1) {
-                        cardTypeSelect.value = result.types[0];
-                        validateForm();
-                    }
-                    
-                    // Check if used
-                    const used = salesData.find(s => s.cardNumber === num);
-                    
-                    badge.style.display = 'inline-block';
-                    badge.className = 'card-status-badge card-valid';
-                    badge.textContent = used ? 'USED' : 'VALID';
-                    
-                    cardError.style.display = 'none';
-                    
-                    // Enable submit only if card type is selected
-                    validateForm();
-                } else {
-                    currentCardTypes = [];
-                    cardTypeSelect.innerHTML = '<option value="">Select</option>';
-                    
-                    badge.style.display = 'inline-block';
-                    badge.className = 'card-status-badge card-invalid';
-                    badge.textContent = 'INVALID';
-                    
-                    cardError.style.display = 'block';
-                    submitBtn.disabled = true;
-                }
-            } catch (error) {
-                console.error('Card validation error:', error);
-            }
-        }
-
-        function validateCardType() {
-            validateForm();
-        }
-
-        function validateForm() {
-            const cardNumber = document.getElementById('cardNumber').value.trim();
-            const cardType = document.getElementById('cardType').value;
-            const submitBtn = document.getElementById('submitBtn');
-            
-            // Check if card number exists in master data and type matches
-            const isValid = cardNumber && cardType && currentCardTypes.includes(cardType);
-            submitBtn.disabled = !isValid;
-        }
-
-        async function checkEditCard() {
-            const num = document.getElementById('editCardNumber').value.trim();
-            const badge = document.getElementById('editCardValidationBadge');
-            const cardTypeSelect = document.getElementById('editCardType');
-            
-            if (!num) {
-                badge.style.display = 'none';
-                return;
-            }
-            
-            try {
-                const response = await fetch(`/api/validate-card/${encodeURIComponent(num)}`);
-                const result = await response.json();
-                
-                if (result.exists) {
-                    const options = result.types.map(type => `<option value="${type}">${type}</option>`).join('');
-                    cardTypeSelect.innerHTML = '<option value="">Select</option>' + options;
-                    
-                    badge.style.display = 'inline-block';
-                    badge.className = 'card-status-badge card-valid';
-                    badge.textContent = 'VALID';
-                } else {
-                    cardTypeSelect.innerHTML = '<option value="">Select</option>';
-                    badge.style.display = 'inline-block';
-                    badge.className = 'card-status-badge card-invalid';
-                    badge.textContent = 'NOT FOUND';
-                }
-            } catch (error) {
-                console.error('Card validation error:', error);
-            }
-        }
-
-        document.getElementById('saleForm').addEventListener('submit', async function(e) {
-            e.preventDefault();
-            
-            const editId = document.getElementById('editId').value;
-            const record = {
-                id: editId || Date.now().toString(),
-                dateTime: document.getElementById('dateTime').value,
-                cardNumber: document.getElementById('cardNumber').value.trim(),
-                cardType: document.getElementById('cardType').value,
-                machine: document.getElementById('machine').value,
-                vendor: document.getElementById('vendor').value,
-                model: document.getElementById('model').value,
-                amount: parseFloat(document.getElementById('amount').value),
-                type: document.getElementById('type').value
-            };
-            
-            try {
-                const url = editId ? `/api/sales/${editId}` : '/api/sales';
-                const method = editId ? 'PUT' : 'POST';
-                
-                const response = await fetch(url, {
-                    method: method,
-                    headers: {'Content-Type': 'application/json'},
-                    body: JSON.stringify(record)
-                });
-                
-                const result = await response.json();
-                
-                if (!result.success) {
-                    showAlert(result.error || 'Failed to save', 'error');
-                    return;
-                }
-                
-                if (editId) {
-                    const idx = salesData.findIndex(s => s.id === editId);
-                    if (idx !== -1) salesData[idx] = record;
-                    showAlert('Record updated!', 'success');
-                } else {
-                    salesData.unshift(record);
-                    showAlert('Sale saved!', 'success');
-                }
-                clearForm();
-            } catch (error) {
-                showAlert('Save failed: ' + error.message, 'error');
-            }
-        });
-
-        function clearForm() {
-            document.getElementById('saleForm').reset();
-            document.getElementById('editId').value = '';
-            document.getElementById('submitBtn').textContent = 'Submit Sale';
-            document.getElementById('cardValidationBadge').style.display = 'none';
-            document.getElementById('cardError').style.display = 'none';
-            document.getElementById('submitBtn').disabled = true;
-            currentCardTypes = [];
-            populateCardTypeDropdown();
-            setCurrentDateTime();
-        }
-
-        function showAlert(message, type) {
-            const alert = document.getElementById('alertBox');
-            alert.textContent = message;
-            alert.className = 'alert alert-' + type;
-            setTimeout(() => alert.className = 'alert', 5000);
-        }
-
-        // ==================== BULK DELETE FUNCTIONS ====================
-        
-        function loadSales() {
-            const tbody = document.getElementById('recordsBody');
-            tbody.innerHTML = '';
-            
-            salesData.forEach(record => {
-                const row = tbody.insertRow();
-                const isSelected = selectedRecords.has(record.id);
-                if (isSelected) row.classList.add('selected');
-                
-                row.innerHTML = `
-                    <td class="checkbox-cell"><input type="checkbox" ${isSelected ? 'checked' : ''} onchange="toggleRecordSelection('${record.id}', this)"></td>
-                    <td>${new Date(record.dateTime).toLocaleString()}</td>
-                    <td>${record.cardNumber}</td>
-                    <td>${record.cardType}</td>
-                    <td>${record.machine}</td>
-                    <td>${record.vendor}</td>
-                    <td>${record.model}</td>
-                    <td>₹${record.amount.toLocaleString()}</td>
-                    <td>${record.type}</td>
-                    <td>
-                        <div class="action-btns">
-                            <button class="btn btn-info" onclick="editRecord('${record.id}')">Edit</button>
-                            <button class="btn btn-danger" onclick="deleteRecord('${record.id}')">Delete</button>
-                        </div>
-                    </td>
-                `;
-            });
-            
-            updateBulkDeleteBar();
-        }
-
-        function toggleRecordSelection(id, checkbox) {
-            if (checkbox.checked) {
-                selectedRecords.add(id);
-                checkbox.closest('tr').classList.add('selected');
-            } else {
-                selectedRecords.delete(id);
-                checkbox.closest('tr').classList.remove('selected');
-            }
-            updateBulkDeleteBar();
-        }
-
-        function toggleSelectAll() {
-            const selectAllCheckbox = document.getElementById('selectAllCheckbox');
-            const checkboxes = document.querySelectorAll('#recordsBody input[type="checkbox"]');
-            const visibleRows = document.querySelectorAll('#recordsBody tr');
-            
-            checkboxes.forEach((checkbox, index) => {
-                checkbox.checked = selectAllCheckbox.checked;
-                const row = visibleRows[index];
-                const recordId = salesData[index].id;
-                
-                if (selectAllCheckbox.checked) {
-                    selectedRecords.add(recordId);
-                    row.classList.add('selected');
-                } else {
-                    selectedRecords.delete(recordId);
-                    row.classList.remove('selected');
-                }
-            });
-            
-            updateBulkDeleteBar();
-        }
-
-        function updateBulkDeleteBar() {
-            const bar = document.getElementById('bulkDeleteBar');
-            const countSpan = document.getElementById('selectedCount');
-            
-            if (selectedRecords.size > 0) {
-                bar.classList.add('active');
-                countSpan.textContent = selectedRecords.size;
-            } else {
-                bar.classList.remove('active');
-            }
-        }
-
-        function clearSelection() {
-            selectedRecords.clear();
-            document.getElementById('selectAllCheckbox').checked = false;
-            loadSales();
-        }
-
-        async function deleteSelected() {
-            if (selectedRecords.size === 0) return;
-            
-            if (!confirm(`Are you sure you want to delete ${selectedRecords.size} selected records? This action cannot be undone.`)) {
-                return;
-            }
-            
-            try {
-                const response = await fetch('/api/sales/bulk-delete', {
-                    method: 'POST',
-                    headers: {'Content-Type': 'application/json'},
-                    body: JSON.stringify({ ids: Array.from(selectedRecords) })
-                });
-                
-                const result = await response.json();
-                
-                if (result.success) {
-                    showAlert(`Successfully deleted ${result.deleted_count} records!`, 'success');
-                    selectedRecords.clear();
-                    document.getElementById('selectAllCheckbox').checked = false;
-                    await syncData();
-                } else {
-                    showAlert('Error: ' + result.error, 'error');
-                }
-            } catch (error) {
-                showAlert('Bulk delete failed: ' + error.message, 'error');
-            }
-        }
-
-        // ==================== END BULK DELETE FUNCTIONS ====================
-
-        async function editRecord(id) {
-            const record = salesData.find(s => s.id === id);
-            if (!record) return;
-            
-            document.getElementById('editModalId').value = record.id;
-            document.getElementById('editDateTime').value = record.dateTime.slice(0, 16);
-            document.getElementById('editCardNumber').value = record.cardNumber;
-            
-            // Validate and populate card types
-            await checkEditCard();
-            
-            document.getElementById('editCardType').value = record.cardType;
-            document.getElementById('editMachine').value = record.machine;
-            document.getElementById('editVendor').value = record.vendor;
-            document.getElementById('editModel').value = record.model;
-            document.getElementById('editAmount').value = record.amount;
-            document.getElementById('editType').value = record.type;
-            
-            document.getElementById('editModal').style.display = 'block';
-        }
-
-        function closeEditModal() {
-            document.getElementById('editModal').style.display = 'none';
-        }
-
-        document.getElementById('editForm').addEventListener('submit', async function(e) {
-            e.preventDefault();
-            
-            const id = document.getElementById('editModalId').value;
-            const record = {
-                dateTime: document.getElementById('editDateTime').value,
-                cardNumber: document.getElementById('editCardNumber').value.trim(),
-                cardType: document.getElementById('editCardType').value,
-                machine: document.getElementById('editMachine').value,
-                vendor: document.getElementById('editVendor').value,
-                model: document.getElementById('editModel').value,
-                amount: parseFloat(document.getElementById('editAmount').value),
-                type: document.getElementById('editType').value
-            };
-            
-            try {
-                const response = await fetch(`/api/sales/${id}`, {
-                    method: 'PUT',
-                    headers: {'Content-Type': 'application/json'},
-                    body: JSON.stringify(record)
-                });
-                
-                const result = await response.json();
-                
-                if (!result.success) {
-                    showAlert(result.error || 'Failed to update', 'error');
-                    return;
-                }
-                
-                const idx = salesData.findIndex(s => s.id === id);
-                if (idx !== -1) {
-                    salesData[idx] = { ...record, id };
-                }
-                
-                closeEditModal();
-                loadSales();
-                showAlert('Record updated successfully!', 'success');
-            } catch (error) {
-                showAlert('Update failed: ' + error.message, 'error');
-            }
-        });
-
-        async function deleteRecord(id) {
-            if (!confirm('Delete this record?')) return;
-            try {
-                await fetch(`/api/sales/${id}`, {method: 'DELETE'});
-                salesData = salesData.filter(r => r.id !== id);
-                selectedRecords.delete(id);
-                loadSales();
-                showAlert('Deleted', 'success');
-            } catch (error) {
-                showAlert('Delete failed', 'error');
-            }
-        }
-
-        function filterRecords() {
-            const start = document.getElementById('startDate').value;
-            const end = document.getElementById('endDate').value;
-            if (!start || !end) return;
-            
-            const rows = document.getElementById('recordsBody').getElementsByTagName('tr');
-            const startDate = new Date(start);
-            const endDate = new Date(end);
-            endDate.setHours(23, 59, 59);
-            
-            Array.from(rows).forEach(row => {
-                const dateText = row.cells[1].textContent;
-                const rowDate = new Date(dateText);
-                row.style.display = (rowDate >= startDate && rowDate <= endDate) ? '' : 'none';
-            });
-        }
-
-        function filterRecordsByMonth() {
-            const month = document.getElementById('recordMonthFilter').value;
-            if (!month) return;
-            
-            const rows = document.getElementById('recordsBody').getElementsByTagName('tr');
-            
-            Array.from(rows).forEach(row => {
-                const dateText = row.cells[1].textContent;
-                const rowDate = new Date(dateText);
-                const rowMonth = rowDate.toISOString().slice(0, 7);
-                row.style.display = (rowMonth === month) ? '' : 'none';
-            });
-        }
-
-        function clearDateFilter() {
-            document.getElementById('startDate').value = '';
-            document.getElementById('endDate').value = '';
-            document.getElementById('recordMonthFilter').value = '';
-            loadSales();
-        }
-
-        function searchRecords() {
-            const term = document.getElementById('searchRecords').value.toLowerCase();
-            const rows = document.getElementById('recordsBody').getElementsByTagName('tr');
-            Array.from(rows).forEach(row => {
-                row.style.display = row.textContent.toLowerCase().includes(term) ? '' : 'none';
-            });
-        }
-
-        async function exportToCSV() {
-            const filters = {
-                startDate: document.getElementById('exportStartDate').value,
-                endDate: document.getElementById('exportEndDate').value,
-                month: document.getElementById('exportMonth').value
-            };
-            
-            try {
-                const response = await fetch('/api/export/csv', {
-                    method: 'POST',
-                    headers: {'Content-Type': 'application/json'},
-                    body: JSON.stringify({filters})
-                });
-                
-                if (response.ok) {
-                    const blob = await response.blob();
-                    const url = window.URL.createObjectURL(blob);
-                    const a = document.createElement('a');
-                    a.href = url;
-                    a.download = `sales_export_${new Date().toISOString().slice(0,10)}.csv`;
-                    document.body.appendChild(a);
-                    a.click();
-                    document.body.removeChild(a);
-                    window.URL.revokeObjectURL(url);
-                    showAlert('CSV exported successfully!', 'success');
-                }
-            } catch (error) {
-                showAlert('Export failed: ' + error.message, 'error');
-            }
-        }
-
-        function exportToExcelFiltered() {
-            const startDate = document.getElementById('exportStartDate').value;
-            const endDate = document.getElementById('exportEndDate').value;
-            const month = document.getElementById('exportMonth').value;
-            
-            let filteredData = [...salesData];
-            
-            if (startDate) {
-                filteredData = filteredData.filter(s => s.dateTime >= startDate + 'T00:00:00');
-            }
-            if (endDate) {
-                filteredData = filteredData.filter(s => s.dateTime <= endDate + 'T23:59:59');
-            }
-            if (month) {
-                filteredData = filteredData.filter(s => s.dateTime.slice(0, 7) === month);
-            }
-            
-            const ws = XLSX.utils.json_to_sheet(filteredData);
-            const wb = XLSX.utils.book_new();
-            XLSX.utils.book_append_sheet(wb, ws, 'Sales');
-            XLSX.writeFile(wb, `sales_export_${new Date().toISOString().split('T')[0]}.xlsx`);
-            showAlert('Excel exported successfully!', 'success');
-        }
-
-        function loadInventory() {
-            comparisonData = [];
-            const usedCards = new Set(salesData.map(s => s.cardNumber));
-            
-            inventoryData.forEach(card => {
-                const cardSales = salesData.filter(s => s.cardNumber === card.number);
-                
-                if (cardSales.length === 0) {
-                    comparisonData.push({
-                        cardNumber: card.number,
-                        cardType: card.type,
-                        status: 'Available',
-                        dateTime: '-',
-                        vendor: '-',
-                        model: '-',
-                        amount: '-'
-                    });
-                } else {
-                    cardSales.forEach(sale => {
-                        comparisonData.push({
-                            cardNumber: card.number,
-                            cardType: card.type,
-                            status: 'Used',
-                            dateTime: sale.dateTime,
-                            vendor: sale.vendor,
-                            model: sale.model,
-                            amount: sale.amount
-                        });
-                    });
-                }
-            });
-            
-            comparisonData.sort((a, b) => {
-                if (a.cardNumber !== b.cardNumber) return a.cardNumber.localeCompare(b.cardNumber);
-                if (a.dateTime === '-') return 1;
-                if (b.dateTime === '-') return -1;
-                return new Date(a.dateTime) - new Date(b.dateTime);
-            });
-            
-            populateFilters();
-            applyInventoryFilters();
-            updateInventoryStats();
-        }
-
-        function populateFilters() {
-            const cardNumbers = [...new Set(comparisonData.map(c => c.cardNumber))].sort();
-            const cardTypes = [...new Set(comparisonData.map(c => c.cardType))].sort();
-            const vendors = [...new Set(comparisonData.map(c => c.vendor).filter(v => v !== '-'))].sort();
-            const models = [...new Set(comparisonData.map(c => c.model).filter(m => m !== '-'))].sort();
-            
-            populateSelect('filterCardNumber', cardNumbers);
-            populateSelect('filterCardType', cardTypes);
-            populateSelect('filterVendor', vendors);
-            populateSelect('filterModel', models);
-        }
-
-        function populateSelect(id, values) {
-            const select = document.getElementById(id);
-            while (select.options.length > 1) select.remove(1);
-            values.forEach(val => {
-                const opt = document.createElement('option');
-                opt.value = val;
-                opt.textContent = val;
-                select.appendChild(opt);
-            });
-        }
-
-        function applyInventoryFilters() {
-            const filters = {
-                cardNumber: document.getElementById('filterCardNumber').value,
-                cardType: document.getElementById('filterCardType').value,
-                status: document.getElementById('filterStatus').value,
-                vendor: document.getElementById('filterVendor').value,
-                model: document.getElementById('filterModel').value
-            };
-            
-            const monthFilter = document.getElementById('inventoryMonthFilter').value;
-            const showRemaining = document.getElementById('showRemainingForModel').checked;
-            const remainingStats = document.getElementById('remainingStats');
-            let filtered = [...comparisonData];
-            
-            if (monthFilter) {
-                filtered = filtered.filter(item => {
-                    if (item.dateTime === '-') return false;
-                    return item.dateTime.slice(0, 7) === monthFilter;
-                });
-            }
-            
-            if (showRemaining && filters.model) {
-                let usedForModel = comparisonData.filter(c => c.model === filters.model && c.status === 'Used');
-                if (filters.cardType) usedForModel = usedForModel.filter(c => c.cardType === filters.cardType);
-                const cardsUsedForModel = new Set(usedForModel.map(c => c.cardNumber));
-                let eligible = filters.cardType ? comparisonData.filter(c => c.cardType === filters.cardType) : [...comparisonData];
-                filtered = eligible.filter(item => !cardsUsedForModel.has(item.cardNumber));
-                
-                if (filters.cardNumber) filtered = filtered.filter(i => i.cardNumber === filters.cardNumber);
-                if (filters.status) filtered = filtered.filter(i => i.status === filters.status);
-                if (filters.vendor) filtered = filtered.filter(i => i.vendor === filters.vendor);
-                
-                const totalEligible = new Set(eligible.map(c => c.cardNumber)).size;
-                const remaining = totalEligible - cardsUsedForModel.size;
-                const pct = totalEligible > 0 ? Math.round((remaining / totalEligible) * 100) : 0;
-                remainingStats.style.display = 'block';
-                remainingStats.innerHTML = `<strong>📊 Remaining:</strong> ${remaining} of ${totalEligible} cards available (${pct}%)`;
-            } else {
-                remainingStats.style.display = 'none';
-                if (filters.cardNumber) filtered = filtered.filter(i => i.cardNumber === filters.cardNumber);
-                if (filters.cardType) filtered = filtered.filter(i => i.cardType === filters.cardType);
-                if (filters.status) filtered = filtered.filter(i => i.status === filters.status);
-                if (filters.vendor) filtered = filtered.filter(i => i.vendor === filters.vendor);
-                if (filters.model) filtered = filtered.filter(i => i.model === filters.model);
-            }
-            
-            renderInventoryTable(filtered);
-        }
-
-        function renderInventoryTable(data) {
-            const tbody = document.getElementById('inventoryBody');
-            tbody.innerHTML = '';
-            let lastCard = '';
-            
-            data.forEach(item => {
-                const row = tbody.insertRow();
-                if (item.cardNumber === lastCard) row.classList.add('transaction-row');
-                else row.classList.add('card-group-start');
-                lastCard = item.cardNumber;
-                
-                const statusClass = item.status === 'Used' ? 'status-used' : 'status-available';
-                row.innerHTML = `
-                    <td>${item.cardNumber}</td>
-                    <td><span class="inventory-tag">${item.cardType}</span></td>
-                    <td><span class="card-status ${statusClass}">${item.status}</span></td>
-                    <td>${item.dateTime !== '-' ? new Date(item.dateTime).toLocaleString() : '-'}</td>
-                    <td>${item.vendor}</td>
-                    <td>${item.model}</td>
-                    <td>${item.amount !== '-' ? '₹' + item.amount.toLocaleString() : '-'}</td>
-                `;
-            });
-        }
-
-        function clearInventoryFilters() {
-            ['filterCardNumber', 'filterCardType', 'filterStatus', 'filterVendor', 'filterModel'].forEach(id => {
-                document.getElementById(id).value = '';
-            });
-            document.getElementById('showRemainingForModel').checked = false;
-            document.getElementById('remainingStats').style.display = 'none';
-            document.getElementById('inventoryMonthFilter').value = '';
-            applyInventoryFilters();
-        }
-
-        function clearInventoryMonthFilter() {
-            document.getElementById('inventoryMonthFilter').value = '';
-            applyInventoryFilters();
-        }
-
-        function searchInventoryTable() {
-            const term = document.getElementById('searchCards').value.toLowerCase();
-            const rows = document.getElementById('inventoryBody').getElementsByTagName('tr');
-            Array.from(rows).forEach(row => {
-                row.style.display = row.textContent.toLowerCase().includes(term) ? '' : 'none';
-            });
-        }
-
-        function updateInventoryStats() {
-            const usedCards = new Set(salesData.map(s => s.cardNumber));
-            const total = inventoryData.length;
-            const used = usedCards.size;
-            
-            document.getElementById('cardStats').innerHTML = `
-                <div class="stat-card"><h3>Total Cards</h3><div class="stat-number">${total}</div></div>
-                <div class="stat-card"><h3>Used</h3><div class="stat-number">${used}</div></div>
-                <div class="stat-card"><h3>Available</h3><div class="stat-number">${total - used}</div></div>
-                <div class="stat-card"><h3>Transactions</h3><div class="stat-number">${salesData.length}</div></div>
-            `;
-        }
-
-        function loadReports() {
-            const totalAmount = salesData.reduce((sum, r) => sum + r.amount, 0);
-            
-            const byType = {};
-            const byVendor = {};
-            const byModel = {};
-            
-            salesData.forEach(r => {
-                byType[r.cardType] = (byType[r.cardType] || 0) + r.amount;
-                byVendor[r.vendor] = (byVendor[r.vendor] || 0) + r.amount;
-                byModel[r.model] = (byModel[r.model] || 0) + r.amount;
-            });
-            
-            document.getElementById('reportStats').innerHTML = `
-                <div class="stat-card"><h3>Total Sales</h3><div class="stat-number">₹${totalAmount.toLocaleString()}</div></div>
-                <div class="stat-card"><h3>Transactions</h3><div class="stat-number">${salesData.length}</div></div>
-            `;
-            
-            let html = '<h3 style="margin-top: 30px;">By Card Type</h3><table><tr><th>Type</th><th>Amount</th></tr>';
-            Object.entries(byType).sort((a,b) => b[1]-a[1]).forEach(([type, amt]) => {
-                html += `<tr><td>${type}</td><td>₹${amt.toLocaleString()}</td></tr>`;
-            });
-            html += '</table>';
-            
-            html += '<h3 style="margin-top: 30px;">By Vendor</h3><table><tr><th>Vendor</th><th>Amount</th></tr>';
-            Object.entries(byVendor).sort((a,b) => b[1]-a[1]).forEach(([v, amt]) => {
-                html += `<tr><td>${v}</td><td>₹${amt.toLocaleString()}</td></tr>`;
-            });
-            html += '</table>';
-            
-            document.getElementById('reportTables').innerHTML = html;
-        }
-
-        function exportToExcel() {
-            const ws = XLSX.utils.json_to_sheet(salesData);
-            const wb = XLSX.utils.book_new();
-            XLSX.utils.book_append_sheet(wb, ws, 'Sales');
-            XLSX.writeFile(wb, `sales_${new Date().toISOString().split('T')[0]}.xlsx`);
-        }
-        
-        window.onclick = function(event) {
-            const modal = document.getElementById('editModal');
-            if (event.target == modal) {
-                modal.style.display = 'none';
-            }
-        }
-    </script>
+    <script src="{{ assets['app.js'] }}"></script>
 </body>
 </html>
 '''
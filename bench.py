@@ -0,0 +1,473 @@
+"""Benchmarks for the sales tracker.
+
+Usage: python bench.py [name ...]   (no names runs every benchmark)
+
+Each run works on a throwaway sales.db in a temporary directory, so it is safe
+to run next to a real database. Benchmarks that need a fresh process (e.g. to
+measure peak RSS) re-run this script as `bench.py --probe <name>` inside the
+same directory.
+"""
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import zlib
+import resource
+import sqlite3
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+os.chdir(os.environ.get('BENCH_WORKDIR') or tempfile.mkdtemp(prefix='sales-bench-'))
+
+import app as tracker
+
+BENCHMARKS = {}
+PROBES = {}
+
+MACHINES = ['M1', 'M2', 'M3', 'M4']
+VENDORS = ['Croma', 'Reliance Digital', 'Vijay Sales', 'Poorvika', 'Sangeetha']
+MODELS = ['iPhone 15', 'Galaxy S24', 'Pixel 8', 'OnePlus 12', 'Redmi Note 13', 'Vivo V30']
+
+def benchmark(fn):
+    BENCHMARKS[fn.__name__] = fn
+    return fn
+
+def probe(fn):
+    PROBES[fn.__name__] = fn
+    return fn
+
+# Run a probe in a fresh interpreter sharing the benchmark database. mmap is
+# disabled there so file pages SQLite maps in do not count as process memory.
+def run_probe(name, *args):
+    env = dict(os.environ, BENCH_WORKDIR=os.getcwd(), SQLITE_MMAP_SIZE='0')
+    out = subprocess.run([sys.executable, os.path.join(HERE, 'bench.py'), '--probe', name, *args],
+                         env=env, capture_output=True, text=True, check=True).stdout
+    return out.strip()
+
+def max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def card_number(i):
+    return f'4{i:015d}'
+
+def make_sale(i, cards):
+    n = i % cards
+    return (
+        f'S{i:09d}',
+        f'2024-{1 + i % 12:02d}-{1 + i % 28:02d}T{i % 24:02d}:{i % 60:02d}:00',
+        card_number(n), tracker.CARD_TYPES[n % len(tracker.CARD_TYPES)],
+        MACHINES[i % len(MACHINES)], VENDORS[i % len(VENDORS)], MODELS[i % len(MODELS)],
+        float(1000 + (i * 37) % 90000), 'EMI' if i % 3 == 0 else 'INSTANT'
+    )
+
+# Replace the benchmark database contents with a deterministic data set
+def seed(sales, cards):
+    conn = sqlite3.connect(tracker.DB_PATH)
+    conn.execute('DELETE FROM sales')
+    conn.execute('DELETE FROM inventory')
+    conn.executemany('INSERT INTO inventory (number, type) VALUES (?,?)', (
+        (card_number(n), tracker.CARD_TYPES[n % len(tracker.CARD_TYPES)]) for n in range(cards)
+    ))
+    conn.executemany('INSERT INTO sales VALUES (?,?,?,?,?,?,?,?,?)', (
+        make_sale(i, cards) for i in range(sales)
+    ))
+    conn.commit()
+    conn.close()
+
+# Call fn repeatedly for roughly `seconds` and return calls per second
+def rate(fn, seconds=2.0):
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        fn()
+        calls += 1
+    return calls / (time.perf_counter() - start)
+
+@benchmark
+def requests_per_second():
+    cards = 5000
+    seed(sales=2000, cards=cards)
+    client = tracker.app.test_client()
+    counter = iter(range(10**9))
+
+    def post_sale():
+        sale = make_sale(10**6 + next(counter), cards)
+        keys = ['id', 'dateTime', 'cardNumber', 'cardType', 'machine', 'vendor', 'model', 'amount', 'type']
+        return client.post('/api/sales', json=dict(zip(keys, sale)))
+
+    cases = [
+        ('GET  /api/validate-card/<n>', lambda: client.get(f'/api/validate-card/{card_number(42)}')),
+        ('POST /api/sales', post_sale),
+        ('GET  /api/inventory', lambda: client.get('/api/inventory')),
+        ('GET  /api/sales', lambda: client.get('/api/sales')),
+    ]
+    for name, fn in cases:
+        print(f'  {name:<32} {rate(fn):>10.1f} req/s')
+
+    # Concurrent writers: every thread posts sales while others read
+    errors = []
+    lock = threading.Lock()
+
+    def worker(n):
+        local = tracker.app.test_client()
+        for i in range(200):
+            sale = make_sale(2 * 10**6 + n * 1000 + i, cards)
+            keys = ['id', 'dateTime', 'cardNumber', 'cardType', 'machine', 'vendor', 'model', 'amount', 'type']
+            try:
+                ok = local.post('/api/sales', json=dict(zip(keys, sale))).status_code == 200
+            except sqlite3.OperationalError:
+                ok = False
+            if not ok:
+                with lock:
+                    errors.append(n)
+            local.get(f'/api/validate-card/{card_number(i)}')
+
+    threads = 8
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(worker, range(threads)))
+    elapsed = time.perf_counter() - start
+    print(f'  {threads} threads mixed read/write      {threads * 400 / elapsed:>10.1f} req/s, {len(errors)} failed writes')
+
+EXPORT_ROWS = int(os.environ.get('BENCH_EXPORT_ROWS', 1_000_000))
+
+# Stream an export through the test client; reports time to first byte, total
+# time and how far peak RSS grew over the idle process
+def stream_export(path, payload):
+    client = tracker.app.test_client()
+    base = max_rss_mb()
+    start = time.perf_counter()
+    resp = client.post(path, json=payload, buffered=False)
+    ttfb = None
+    size = 0
+    for chunk in resp.response:
+        if ttfb is None:
+            ttfb = time.perf_counter() - start
+        size += len(chunk)
+    resp.close()
+    total = time.perf_counter() - start
+    return f'ttfb {ttfb * 1000:8.1f} ms  total {total:6.2f} s  {size / 2**20:7.1f} MiB  peak RSS +{max_rss_mb() - base:7.1f} MiB'
+
+@probe
+def csv_export(month=''):
+    print(stream_export('/api/export/csv', {'filters': {'month': month}}))
+
+@probe
+def xlsx_export(month=''):
+    print(stream_export('/api/export/xlsx', {'filters': {'month': month}}))
+
+@benchmark
+def export_csv_streaming():
+    seed(sales=EXPORT_ROWS, cards=50000)
+    print(f'  full export, {EXPORT_ROWS} rows:  {run_probe("csv_export")}')
+    print(f'  month 2024-03:              {run_probe("csv_export", "2024-03")}')
+
+@benchmark
+def export_xlsx_streaming():
+    seed(sales=EXPORT_ROWS, cards=50000)
+    print(f'  full export, {EXPORT_ROWS} rows:  {run_probe("xlsx_export")}')
+    print(f'  month 2024-03:              {run_probe("xlsx_export", "2024-03")}')
+
+@probe
+def sales_import(path):
+    fmt = path.rsplit('.', 1)[1]
+    base = max_rss_mb()
+    start = time.perf_counter()
+    with tracker.app.app_context(), open(path, 'rb') as file:
+        mapping, rows = tracker.import_rows(file, fmt)
+        job = tracker.open_import_job(tracker.get_db(), path, fmt)
+        job = tracker.import_sales(tracker.get_db(), job, mapping, rows)
+    total = time.perf_counter() - start
+    print(f"{job['inserted']} rows  {total:6.2f} s  {job['inserted'] / total:8.0f} rows/s  "
+          f'peak RSS +{max_rss_mb() - base:7.1f} MiB')
+
+@benchmark
+def import_streaming():
+    seed(sales=EXPORT_ROWS, cards=50000)
+    client = tracker.app.test_client()
+    for fmt in ['csv', 'xlsx']:
+        with open(f'import.{fmt}', 'wb') as file:
+            resp = client.post(f'/api/export/{fmt}', json={'filters': {}}, buffered=False)
+            for chunk in resp.response:
+                file.write(chunk)
+            resp.close()
+    for fmt in ['csv', 'xlsx']:
+        conn = sqlite3.connect(tracker.DB_PATH)
+        conn.execute('DELETE FROM sales')
+        conn.commit()
+        conn.close()
+        print(f'  {fmt:<4} {os.path.getsize(f"import.{fmt}") / 2**20:7.1f} MiB: {run_probe("sales_import", f"import.{fmt}")}')
+
+@benchmark
+def sales_listing_formats():
+    seed(sales=100000, cards=20000)
+    client = tracker.app.test_client()
+    gzip = {'Accept-Encoding': 'gzip'}
+    for label, query in [('1000-row page', 'limit=1000'), ('full list, 100k', '')]:
+        for fmt in ['rows', 'columnar']:
+            url = '/api/sales?' + query + ('&format=columnar' if fmt == 'columnar' else '')
+            seconds = 5.0 if query else 30.0
+            per_sec = rate(lambda: client.get(url), seconds=seconds)
+            raw = len(client.get(url).data)
+            packed = len(client.get(url, headers=gzip).data)
+            print(f'  {label:<16} {fmt:<9} {1000 / per_sec:9.1f} ms/request  '
+                  f'{raw / 1024:9.1f} KiB  gzip {packed / 1024:8.1f} KiB')
+
+@benchmark
+def remaining_for_model():
+    cards = 100000
+    seed(sales=300000, cards=cards)
+    client = tracker.app.test_client()
+    conn = tracker.connect_db()
+    c = conn.cursor()
+    index = tracker.CardUsageIndex()
+
+    start = time.perf_counter()
+    index.refresh(c)
+    print(f'  build, {cards} cards:          {(time.perf_counter() - start) * 1000:9.1f} ms')
+
+    model, card_type = MODELS[0], tracker.CARD_TYPES[0]
+    per_sec = rate(lambda: index.remaining(model, card_type))
+    print(f'  remaining() counts:           {1e6 / per_sec:9.1f} us/call')
+    per_sec = rate(lambda: index.refresh(c).remaining(model, card_type))
+    print(f'  refresh() + remaining():      {1e6 / per_sec:9.1f} us/call')
+
+    sale = dict(zip(['id', 'dateTime', 'cardNumber', 'cardType', 'machine', 'vendor', 'model', 'amount', 'type'],
+                    make_sale(10**7, cards)))
+    client.post('/api/sales', json=sale)
+    start = time.perf_counter()
+    index.refresh(c)
+    print(f'  refresh after one sale:       {(time.perf_counter() - start) * 1000:9.1f} ms')
+
+    per_sec = rate(lambda: client.get(f'/api/inventory/remaining?model={model}&cardType={card_type}&limit=0'))
+    print(f'  GET /api/inventory/remaining: {1000 / per_sec:9.2f} ms/request')
+
+    def sql_remaining():
+        c.execute('''SELECT COUNT(DISTINCT number) FROM inventory i WHERE type = ? AND NOT EXISTS
+            (SELECT 1 FROM sales s WHERE s.cardNumber = i.number AND s.model = ?)''', (card_type, model))
+        return c.fetchone()[0]
+    per_sec = rate(sql_remaining)
+    print(f'  equivalent SQL query:         {1000 / per_sec:9.2f} ms/call')
+    conn.close()
+
+@benchmark
+def card_validation():
+    cards = 100000
+    seed(sales=20000, cards=cards)
+    client = tracker.app.test_client()
+    conn = tracker.connect_db()
+    c = conn.cursor()
+    index = tracker.card_index
+    numbers = [card_number(n) for n in range(0, cards, 7)]
+    lookups = iter(range(10**9))
+
+    def sql_lookup():
+        c.execute('SELECT DISTINCT type FROM inventory WHERE number = ?', (numbers[next(lookups) % len(numbers)],))
+        return c.fetchall()
+
+    def index_lookup():
+        return index.refresh(c).types_of(numbers[next(lookups) % len(numbers)])
+
+    print(f'  SQL type lookup:              {1e6 / rate(sql_lookup):9.1f} us/call')
+    print(f'  index refresh() + lookup:     {1e6 / rate(index_lookup):9.1f} us/call')
+    per_sec = rate(lambda: client.get(f'/api/validate-card/{numbers[next(lookups) % len(numbers)]}'))
+    print(f'  GET /api/validate-card/<n>:   {1000 / per_sec:9.2f} ms/request')
+
+    # Keystroke-style validation while another connection (as another worker
+    # would) saves the master data every 1000 lookups, each save dropping or
+    # restoring the last card so the inventory changes
+    master = {'cards': [{'number': card_number(n), 'type': tracker.CARD_TYPES[n % len(tracker.CARD_TYPES)]}
+                        for n in range(cards)], 'machines': MACHINES, 'vendors': VENDORS, 'models': MODELS}
+    client.get(f'/api/validate-card/{numbers[0]}')
+    index.hits = index.misses = 0
+    start = time.perf_counter()
+    for i in range(10000):
+        if i % 1000 == 999:
+            cards_saved = master['cards'][:-1] if i % 2000 == 999 else master['cards']
+            tracker.store_master_data(c, dict(master, cards=cards_saved))
+            conn.commit()
+        client.get(f'/api/validate-card/{numbers[i % len(numbers)]}')
+    elapsed = time.perf_counter() - start
+    print(f'  10k validations, 10 saves:    {elapsed * 1000 / 10000:9.2f} ms/request, '
+          f'hit rate {index.hits / (index.hits + index.misses):.2%} ({index.misses} reloads)')
+    conn.close()
+
+SALE_KEYS = ['id', 'dateTime', 'cardNumber', 'cardType', 'machine', 'vendor', 'model', 'amount', 'type']
+WRITER_CARDS = 5000
+WRITES_PER_PROCESS = 1000
+
+# One writer process: adds sales (every 10th with a card type the card does
+# not have) and edits every 5th one it added; returns (ok, rejected, failed)
+def sale_writer(n):
+    client = tracker.app.test_client()
+    counts = [0, 0, 0]
+    for i in range(WRITES_PER_PROCESS):
+        sale = dict(zip(SALE_KEYS, make_sale(10**8 + n * 10**6 + i, WRITER_CARDS)))
+        if i % 10 == 9:
+            sale['cardType'] = 'NONE'
+        try:
+            status = client.post('/api/sales', json=sale).status_code
+            if status == 200 and i % 5 == 0:
+                status = client.put(f"/api/sales/{sale['id']}", json=dict(sale, amount=1.0)).status_code
+        except sqlite3.OperationalError:
+            status = 500
+        counts[0 if status == 200 else 1 if status == 400 else 2] += 1
+    return counts
+
+# Re-saves the master data until `stop` is set, alternately removing and
+# restoring every other card, and ends with the full card list
+def master_data_writer(stop):
+    client = tracker.app.test_client()
+    master = {'cards': [{'number': card_number(n), 'type': tracker.CARD_TYPES[n % len(tracker.CARD_TYPES)]}
+                        for n in range(WRITER_CARDS)], 'machines': MACHINES, 'vendors': VENDORS, 'models': MODELS}
+    saves = 0
+    while not stop.is_set():
+        client.post('/api/master-data', json=dict(master, cards=master['cards'][::2 - saves % 2]))
+        saves += 1
+        time.sleep(0.05)
+    client.post('/api/master-data', json=master)
+    return saves
+
+@benchmark
+def concurrent_sale_writes():
+    import multiprocessing
+    ctx = multiprocessing.get_context('fork')
+    for processes in [1, 4, 8]:
+        seed(sales=20000, cards=WRITER_CARDS)
+        stop = ctx.Manager().Event()
+        with ctx.Pool(processes + 1) as pool:
+            saver = pool.apply_async(master_data_writer, (stop,))
+            start = time.perf_counter()
+            results = pool.map(sale_writer, range(processes))
+            elapsed = time.perf_counter() - start
+            stop.set()
+            saves = saver.get()
+        ok, rejected, failed = (sum(r[i] for r in results) for i in range(3))
+        conn = sqlite3.connect(tracker.DB_PATH)
+        orphans = conn.execute('''SELECT COUNT(*) FROM sales s WHERE NOT EXISTS
+            (SELECT 1 FROM inventory i WHERE i.number = s.cardNumber AND i.type = s.cardType)''').fetchone()[0]
+        conn.close()
+        print(f'  {processes} writer processes: {processes * WRITES_PER_PROCESS / elapsed:8.1f} sales/s  '
+              f'{ok} ok, {rejected} rejected, {failed} failed, {orphans} orphaned, {saves} master data saves')
+        # Every sale is either stored against an inventory card or rejected
+        assert orphans == 0, f'{orphans} sales reference cards not in inventory'
+        assert failed == 0, f'{failed} writes failed'
+
+@benchmark
+def bulk_ingest():
+    cards = 20000
+    client = tracker.app.test_client()
+    for batch in [1000, 10000, 50000]:
+        seed(sales=100000, cards=cards)
+        sales = [dict(zip(SALE_KEYS, make_sale(10**8 + i, cards))) for i in range(batch)]
+        for sale in sales[::20]:
+            sale['cardType'] = 'NONE'
+        start = time.perf_counter()
+        result = client.post('/api/sales/bulk', json={'sales': sales}).json
+        elapsed = time.perf_counter() - start
+        print(f'  batch of {batch:>6}: {batch / elapsed:9.0f} rows/s  '
+              f"{result['inserted']} inserted, {result['failed']} rejected")
+    seed(sales=100000, cards=cards)
+    counter = iter(range(10**9))
+    per_sec = rate(lambda: client.post('/api/sales', json=dict(zip(SALE_KEYS, make_sale(10**9 + next(counter), cards)))))
+    print(f'  one POST /api/sales per row: {per_sec:9.0f} rows/s')
+
+    # The set-based statements must leave the same rollups, search index and
+    # card log as the per-row triggers
+    rows = [make_sale(10**8 + i, cards) for i in range(5000)]
+    snapshots = []
+    for chunk in [len(rows), 1]:
+        seed(sales=20000, cards=cards)
+        conn = tracker.connect_db()
+        seq = conn.execute('SELECT COALESCE(MAX(seq), 0) FROM changes').fetchone()[0]
+        conn.execute('BEGIN IMMEDIATE')
+        for start in range(0, len(rows), chunk):
+            tracker.insert_sales(conn.cursor(), rows[start:start + chunk])
+        conn.commit()
+        conn.execute("INSERT INTO sales_fts (sales_fts, rank) VALUES ('integrity-check', 1)")
+        snapshots.append((
+            conn.execute('SELECT * FROM sales_daily ORDER BY 1, 2, 3, 4, 5').fetchall(),
+            conn.execute("SELECT rowid FROM sales_fts WHERE sales_fts MATCH 'Croma' ORDER BY rowid").fetchall(),
+            conn.execute("SELECT DISTINCT key FROM changes WHERE tbl = 'cards' AND seq > ? ORDER BY key",
+                         (seq,)).fetchall(),
+        ))
+        conn.close()
+    for name, bulk, per_row in zip(['rollups', 'search index', 'card log'], *snapshots):
+        assert bulk == per_row, f'bulk insert and per-row triggers disagree on the {name}'
+    print('  bulk and per-row paths agree:  rollups, search index, card log')
+
+@benchmark
+def master_data_save():
+    cards = 100000
+    seed(sales=1000, cards=cards)
+    client = tracker.app.test_client()
+    master = {'cards': [{'number': card_number(n), 'type': tracker.CARD_TYPES[n % len(tracker.CARD_TYPES)]}
+                        for n in range(cards)], 'machines': MACHINES, 'vendors': VENDORS, 'models': MODELS}
+    client.post('/api/master-data', json=master)
+    conn = sqlite3.connect(tracker.DB_PATH)
+    cases = [
+        ('POST, unchanged', lambda i: client.post('/api/master-data', json=master)),
+        ('POST, one card changed', lambda i: client.post('/api/master-data', json=dict(
+            master, cards=master['cards'][:-1] + [{'number': card_number(cards + i), 'type': 'SBI'}]))),
+        ('PATCH, add one card', lambda i: client.patch('/api/master-data', json={
+            'add': {'cards': [{'number': card_number(2 * cards + i), 'type': 'SBI'}]}})),
+    ]
+    for name, fn in cases:
+        before = conn.execute('SELECT COUNT(*) FROM changes').fetchone()[0]
+        start = time.perf_counter()
+        for i in range(5):
+            fn(i)
+        elapsed = (time.perf_counter() - start) / 5
+        logged = (conn.execute('SELECT COUNT(*) FROM changes').fetchone()[0] - before) / 5
+        print(f'  {name:<24} {elapsed * 1000:8.1f} ms/save  {logged:8.0f} inventory changes/save')
+    conn.close()
+
+@benchmark
+def page_load():
+    seed(sales=1000, cards=1000)
+    client = tracker.app.test_client()
+    with tracker.app.test_request_context():
+        from flask import render_template_string
+        data = tracker.master_data.refresh(tracker.get_db().cursor()).data
+        per_sec = rate(lambda: render_template_string(tracker.HTML_TEMPLATE, assets=tracker.asset_urls,
+                                                      machines=data['machines'],
+                                                      vendors=data['vendors'], models=data['models']))
+    print(f'  render_template_string:       {1000 / per_sec:9.2f} ms/page')
+    etag = client.get('/').headers['ETag']
+    cases = [
+        ('GET /', {}),
+        ('GET /, gzip', {'Accept-Encoding': 'gzip'}),
+        ('GET /, If-None-Match', {'If-None-Match': etag}),
+    ]
+    for name, headers in cases:
+        per_sec = rate(lambda: client.get('/', headers=headers))
+        print(f'  {name:<29} {1000 / per_sec:9.2f} ms/request')
+
+    # What a browser fetches for the main page: the shell, then every
+    # resource it references. Third-party URLs cannot load in offline shops
+    # and would block rendering if placed in <head>.
+    gzip = {'Accept-Encoding': 'gzip'}
+    def first_load():
+        html = client.get('/', headers=gzip)
+        urls = re.findall(r'(?:src|href)="([^"#]+)"', zlib.decompress(html.data, 31).decode())
+        local = [url for url in urls if url.startswith('/')]
+        sizes = [len(client.get(url, headers=gzip).data) for url in local]
+        return len(html.data), sum(sizes), [url for url in urls if not url.startswith('/')]
+    shell, assets, external = first_load()
+    per_sec = rate(first_load)
+    print(f'  first load (gzip):            {(shell + assets) / 1024:9.1f} KiB in {1000 / per_sec:.2f} ms, '
+          f'repeat load {shell / 1024:.1f} KiB')
+    print(f'  third-party resources:        {len(external):9d} {" ".join(external)}')
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--probe']:
+        PROBES[sys.argv[2]](*sys.argv[3:])
+        sys.exit()
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        print(name)
+        BENCHMARKS[name]()
@@ -0,0 +1,943 @@
+let salesData = [];         // Records tab: pages loaded so far, newest first
+let salesCursor = null;     // cursor of the next page, null once exhausted
+let salesLoading = false;
+let salesGeneration = 0;    // bumped on reload so stale page responses are dropped
+let salesFilters = {};      // applied Records filters, sent to /api/sales
+let searchTimer = null;
+const SALES_PAGE_SIZE = 200;
+let changeSeq = null;       // change log position of the last sync
+let comparisonData = [];     // Inventory tab: usage rows loaded so far
+let usageCursor = null;
+let usageLoading = false;
+let usageGeneration = 0;
+let inventorySearchTimer = null;
+const USAGE_PAGE_SIZE = 500;
+let masterData = {};
+let currentCardTypes = [];
+let selectedRecords = new Set();
+let recordsView = null;      // windowed renderer of salesData
+let inventoryView = null;    // windowed renderer of comparisonData
+
+document.addEventListener('DOMContentLoaded', function() {
+    setCurrentDateTime();
+    setInterval(setCurrentDateTime, 60000);
+    loadMasterData();
+    syncData();
+
+    // Fetch the next page of records when the end of the table scrolls into view
+    recordsView = new VirtualTable('recordsBody', () => salesData, renderSaleRow, () => {
+        if (document.getElementById('records').classList.contains('active')) loadMoreSales();
+    });
+    inventoryView = new VirtualTable('inventoryBody', () => comparisonData, renderInventoryRow, () => {
+        if (document.getElementById('inventory').classList.contains('active')) loadMoreInventory();
+    });
+
+    const today = new Date().toISOString().split('T')[0];
+    document.getElementById('endDate').value = today;
+
+    const currentMonth = new Date().toISOString().slice(0, 7);
+    document.getElementById('exportMonth').value = currentMonth;
+});
+
+async function loadMasterData() {
+    try {
+        const response = await fetch('/api/master-data');
+        const result = await response.json();
+        masterData = result.data;
+        populateCardTypeDropdown();
+    } catch (error) {
+        console.error('Failed to load master data:', error);
+    }
+}
+
+function populateCardTypeDropdown() {
+    const cardTypeSelect = document.getElementById('cardType');
+    const editCardTypeSelect = document.getElementById('editCardType');
+
+    // Get unique card types from master data
+    const cardTypes = [...new Set(masterData.cards.map(c => c.type))].sort();
+
+    const options = cardTypes.map(type => `<option value="${type}">${type}</option>`).join('');
+
+    cardTypeSelect.innerHTML = '<option value="">Select</option>' + options;
+    editCardTypeSelect.innerHTML = '<option value="">Select</option>' + options;
+}
+
+function setCurrentDateTime() {
+    const now = new Date();
+    document.getElementById('dateTime').value = now.toISOString().slice(0, 16);
+}
+
+// First sync (or a reset from the server) loads everything; later syncs
+// only replay the change log since changeSeq
+async function syncData() {
+    try {
+        let reloadSales = changeSeq === null;
+        if (!reloadSales) {
+            const response = await fetch(`/api/sales/changes?since=${changeSeq}`);
+            const changes = await response.json();
+            if (changes.reset) {
+                reloadSales = true;
+            } else {
+                reloadSales = applySalesChanges(changes.sales);
+                changeSeq = changes.seq;
+            }
+        }
+        if (reloadSales) await fullSync();
+
+        document.getElementById('lastSync').textContent = 'Last sync: ' + new Date().toLocaleTimeString();
+        showAlert('Data synced!', 'success');
+
+        if (document.getElementById('records').classList.contains('active')) {
+            if (reloadSales) loadSales(); else renderSales();
+        }
+        if (document.getElementById('inventory').classList.contains('active')) loadInventory();
+        if (document.getElementById('reports').classList.contains('active')) loadReports();
+
+    } catch (error) {
+        showAlert('Sync failed: ' + error.message, 'error');
+    }
+}
+
+// The listings reload themselves page by page; a full sync only has to
+// move to the current log position
+async function fullSync() {
+    const response = await fetch('/api/sales/changes');
+    changeSeq = (await response.json()).seq;
+}
+
+function compareSales(a, b) {
+    if (a.dateTime !== b.dateTime) return a.dateTime < b.dateTime ? 1 : -1;
+    return a.id < b.id ? 1 : (a.id > b.id ? -1 : 0);
+}
+
+// Merge sales deltas into the loaded pages; returns true when the
+// listing has to be reloaded because filters are applied
+function applySalesChanges(changes) {
+    const deleted = new Set(changes.deleted);
+    deleted.forEach(id => selectedRecords.delete(id));
+    if (changes.upserted.length && Object.values(salesFilters).some(v => v)) return true;
+
+    // Rows past the last loaded one belong to pages not fetched yet
+    const boundary = salesCursor ? salesData[salesData.length - 1] : null;
+    const upserted = new Map(changes.upserted.map(s => [s.id, s]));
+    salesData = salesData.filter(s => !deleted.has(s.id) && !upserted.has(s.id));
+    upserted.forEach(sale => {
+        if (!boundary || compareSales(sale, boundary) <= 0) salesData.push(sale);
+    });
+    if (upserted.size) salesData.sort(compareSales);
+    return false;
+}
+
+function showTab(tabName) {
+    document.querySelectorAll('.content').forEach(c => c.classList.remove('active'));
+    document.querySelectorAll('.tab').forEach(t => t.classList.remove('active'));
+    document.getElementById(tabName).classList.add('active');
+    event.target.classList.add('active');
+
+    if (tabName === 'records') loadSales();
+    if (tabName === 'inventory') loadInventory();
+    if (tabName === 'reports') loadReports();
+}
+
+async function checkCard() {
+    const num = document.getElementById('cardNumber').value.trim();
+    const badge = document.getElementById('cardValidationBadge');
+    const cardError = document.getElementById('cardError');
+    const cardTypeSelect = document.getElementById('cardType');
+    const submitBtn = document.getElementById('submitBtn');
+
+    if (!num) {
+        badge.style.display = 'none';
+        cardError.style.display = 'none';
+        submitBtn.disabled = true;
+        return;
+    }
+
+    try {
+        const response = await fetch(`/api/validate-card/${encodeURIComponent(num)}`);
+        const result = await response.json();
+
+        if (result.exists) {
+            currentCardTypes = result.types;
+
+            // Populate card type dropdown with available types for this card
+            const options = result.types.map(type => `<option value="${type}">${type}</option>`).join('');
+            cardTypeSelect.innerHTML = '<option value="">Select</option>' + options;
+
+            // AUTO-SELECT: If only one card type exists, select it automatically
+            if (result.types.length === 1) {
+                cardTypeSelect.value = result.types[0];
+                validateForm();
+            }
+
+            badge.style.display = 'inline-block';
+            badge.className = 'card-status-badge card-valid';
+            badge.textContent = result.used ? 'USED' : 'VALID';
+
+            cardError.style.display = 'none';
+
+            // Enable submit only if card type is selected
+            validateForm();
+        } else {
+            currentCardTypes = [];
+            cardTypeSelect.innerHTML = '<option value="">Select</option>';
+
+            badge.style.display = 'inline-block';
+            badge.className = 'card-status-badge card-invalid';
+            badge.textContent = 'INVALID';
+
+            cardError.style.display = 'block';
+            submitBtn.disabled = true;
+        }
+    } catch (error) {
+        console.error('Card validation error:', error);
+    }
+}
+
+function validateCardType() {
+    validateForm();
+}
+
+function validateForm() {
+    const cardNumber = document.getElementById('cardNumber').value.trim();
+    const cardType = document.getElementById('cardType').value;
+    const submitBtn = document.getElementById('submitBtn');
+
+    // Check if card number exists in master data and type matches
+    const isValid = cardNumber && cardType && currentCardTypes.includes(cardType);
+    submitBtn.disabled = !isValid;
+}
+
+async function checkEditCard() {
+    const num = document.getElementById('editCardNumber').value.trim();
+    const badge = document.getElementById('editCardValidationBadge');
+    const cardTypeSelect = document.getElementById('editCardType');
+
+    if (!num) {
+        badge.style.display = 'none';
+        return;
+    }
+
+    try {
+        const response = await fetch(`/api/validate-card/${encodeURIComponent(num)}`);
+        const result = await response.json();
+
+        if (result.exists) {
+            const options = result.types.map(type => `<option value="${type}">${type}</option>`).join('');
+            cardTypeSelect.innerHTML = '<option value="">Select</option>' + options;
+
+            badge.style.display = 'inline-block';
+            badge.className = 'card-status-badge card-valid';
+            badge.textContent = 'VALID';
+        } else {
+            cardTypeSelect.innerHTML = '<option value="">Select</option>';
+            badge.style.display = 'inline-block';
+            badge.className = 'card-status-badge card-invalid';
+            badge.textContent = 'NOT FOUND';
+        }
+    } catch (error) {
+        console.error('Card validation error:', error);
+    }
+}
+
+document.getElementById('saleForm').addEventListener('submit', async function(e) {
+    e.preventDefault();
+
+    const editId = document.getElementById('editId').value;
+    const record = {
+        id: editId || Date.now().toString(),
+        dateTime: document.getElementById('dateTime').value,
+        cardNumber: document.getElementById('cardNumber').value.trim(),
+        cardType: document.getElementById('cardType').value,
+        machine: document.getElementById('machine').value,
+        vendor: document.getElementById('vendor').value,
+        model: document.getElementById('model').value,
+        amount: parseFloat(document.getElementById('amount').value),
+        type: document.getElementById('type').value
+    };
+
+    try {
+        const url = editId ? `/api/sales/${editId}` : '/api/sales';
+        const method = editId ? 'PUT' : 'POST';
+
+        const response = await fetch(url, {
+            method: method,
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify(record)
+        });
+
+        const result = await response.json();
+
+        if (!result.success) {
+            showAlert(result.error || 'Failed to save', 'error');
+            return;
+        }
+
+        if (editId) {
+            const idx = salesData.findIndex(s => s.id === editId);
+            if (idx !== -1) salesData[idx] = record;
+            showAlert('Record updated!', 'success');
+        } else {
+            salesData.unshift(record);
+            showAlert('Sale saved!', 'success');
+        }
+        clearForm();
+    } catch (error) {
+        showAlert('Save failed: ' + error.message, 'error');
+    }
+});
+
+function clearForm() {
+    document.getElementById('saleForm').reset();
+    document.getElementById('editId').value = '';
+    document.getElementById('submitBtn').textContent = 'Submit Sale';
+    document.getElementById('cardValidationBadge').style.display = 'none';
+    document.getElementById('cardError').style.display = 'none';
+    document.getElementById('submitBtn').disabled = true;
+    currentCardTypes = [];
+    populateCardTypeDropdown();
+    setCurrentDateTime();
+}
+
+function showAlert(message, type) {
+    const alert = document.getElementById('alertBox');
+    alert.textContent = message;
+    alert.className = 'alert alert-' + type;
+    setTimeout(() => alert.className = 'alert', 5000);
+}
+
+// ==================== VIRTUAL TABLES ====================
+
+const VIRTUAL_BUFFER = 10;          // rows kept rendered above and below the viewport
+const VIRTUAL_ROW_HEIGHT = 49;      // estimate until a rendered row can be measured
+
+// Renders only the rows of getRows() scrolled into view in the table's
+// scroll container, between two spacer rows that stand in for the rest.
+// Row nodes are pooled and handed back to renderRow(row, item, index);
+// onNearEnd fires when the window reaches the end of the loaded rows.
+class VirtualTable {
+    constructor(bodyId, getRows, renderRow, onNearEnd) {
+        this.body = document.getElementById(bodyId);
+        this.container = this.body.closest('.table-container');
+        this.getRows = getRows;
+        this.renderRow = renderRow;
+        this.onNearEnd = onNearEnd;
+        this.rowHeight = 0;
+        this.pool = [];
+        this.frame = 0;
+
+        const columns = this.body.closest('table').tHead.rows[0].cells.length;
+        this.top = this.spacer(columns);
+        this.bottom = this.spacer(columns);
+        this.body.replaceChildren(this.top, this.bottom);
+        this.container.addEventListener('scroll', () => this.schedule(), {passive: true});
+        window.addEventListener('resize', () => this.schedule());
+    }
+
+    spacer(columns) {
+        const row = document.createElement('tr');
+        row.className = 'virtual-spacer';
+        row.appendChild(document.createElement('td')).colSpan = columns;
+        return row;
+    }
+
+    schedule() {
+        if (this.frame) return;
+        this.frame = requestAnimationFrame(() => {
+            this.frame = 0;
+            this.render();
+        });
+    }
+
+    // Back to the top, e.g. after the rows were replaced by a new query
+    reset() {
+        this.container.scrollTop = 0;
+        this.render(true);
+    }
+
+    // Redraw the visible rows; force also repaints rows whose item is unchanged
+    render(force = false) {
+        const rows = this.getRows();
+        const height = this.rowHeight || VIRTUAL_ROW_HEIGHT;
+        const scrolled = Math.max(0, this.container.scrollTop - this.body.offsetTop);
+        const viewport = this.container.clientHeight || window.innerHeight;
+        const first = Math.min(rows.length, Math.max(0, Math.floor(scrolled / height) - VIRTUAL_BUFFER));
+        const last = Math.min(rows.length, Math.ceil((scrolled + viewport) / height) + VIRTUAL_BUFFER);
+
+        // Rows still inside the window keep their node; the rest are recycled
+        const kept = new Map();
+        const free = [];
+        this.pool.forEach(row => {
+            if (row.index >= first && row.index < last) kept.set(row.index, row);
+            else free.push(row);
+        });
+        const pool = [];
+        let previous = this.top;
+        for (let i = first; i < last; i++) {
+            const row = kept.get(i) || free.pop() || document.createElement('tr');
+            if (force || row.item !== rows[i] || row.index !== i) {
+                this.renderRow(row, rows[i], i);
+                row.item = rows[i];
+                row.index = i;
+            }
+            if (previous.nextSibling !== row) this.body.insertBefore(row, previous.nextSibling);
+            previous = row;
+            pool.push(row);
+        }
+        free.forEach(row => {
+            row.remove();
+            row.index = -1;
+            pool.push(row);
+        });
+        this.pool = pool;
+        this.top.firstChild.style.height = first * height + 'px';
+        this.bottom.firstChild.style.height = (rows.length - last) * height + 'px';
+
+        // Size the spacers from a real row once one is on screen
+        if (!this.rowHeight && pool.length && pool[0].offsetHeight) {
+            this.rowHeight = pool[0].offsetHeight;
+            this.schedule();
+        }
+        if (last >= rows.length - VIRTUAL_BUFFER && this.onNearEnd) this.onNearEnd();
+    }
+}
+
+// ==================== PAGED SALES LOADING ====================
+
+async function fetchSalesPage(cursor, filters = {}) {
+    const params = new URLSearchParams({limit: SALES_PAGE_SIZE, format: 'columnar'});
+    Object.entries(filters).forEach(([key, value]) => { if (value) params.set(key, value); });
+    if (cursor) params.set('cursor', cursor);
+    const response = await fetch('/api/sales?' + params);
+    const result = await response.json();
+    if (result.format === 'columnar') result.data = decodeColumnar(result);
+    return result;
+}
+
+// Rebuild row objects from the columnar payload
+function decodeColumnar(result) {
+    const columns = result.columns.map(name => [name, result.data[name]]);
+    const rows = new Array(result.length);
+    for (let i = 0; i < result.length; i++) {
+        const row = {};
+        for (const [name, column] of columns) {
+            row[name] = Array.isArray(column) ? column[i] : column.values[column.codes[i]];
+        }
+        rows[i] = row;
+    }
+    return rows;
+}
+
+async function loadSales() {
+    salesGeneration++;
+    salesData = [];
+    salesCursor = null;
+    salesLoading = false;
+    recordsView.reset();
+    await loadMoreSales(true);
+}
+
+async function loadMoreSales(first = false) {
+    if (salesLoading || (!first && !salesCursor)) return;
+    const generation = salesGeneration;
+    salesLoading = true;
+    try {
+        const result = await fetchSalesPage(salesCursor, salesFilters);
+        if (generation !== salesGeneration) return;
+        salesCursor = result.next_cursor;
+        salesData.push(...result.data);
+        recordsView.render();
+        updateBulkDeleteBar();
+    } catch (error) {
+        showAlert('Failed to load records: ' + error.message, 'error');
+    } finally {
+        if (generation === salesGeneration) salesLoading = false;
+    }
+}
+
+// ==================== BULK DELETE FUNCTIONS ====================
+
+function renderSales() {
+    recordsView.render(true);
+    updateBulkDeleteBar();
+}
+
+function renderSaleRow(row, record) {
+    const isSelected = selectedRecords.has(record.id);
+    row.className = isSelected ? 'selected' : '';
+    row.innerHTML = `
+        <td class="checkbox-cell"><input type="checkbox" ${isSelected ? 'checked' : ''} onchange="toggleRecordSelection('${record.id}', this)"></td>
+        <td>${new Date(record.dateTime).toLocaleString()}</td>
+        <td>${record.cardNumber}</td>
+        <td>${record.cardType}</td>
+        <td>${record.machine}</td>
+        <td>${record.vendor}</td>
+        <td>${record.model}</td>
+        <td>₹${record.amount.toLocaleString()}</td>
+        <td>${record.type}</td>
+        <td>
+            <div class="action-btns">
+                <button class="btn btn-info" onclick="editRecord('${record.id}')">Edit</button>
+                <button class="btn btn-danger" onclick="deleteRecord('${record.id}')">Delete</button>
+            </div>
+        </td>
+    `;
+}
+
+function toggleRecordSelection(id, checkbox) {
+    if (checkbox.checked) {
+        selectedRecords.add(id);
+        checkbox.closest('tr').classList.add('selected');
+    } else {
+        selectedRecords.delete(id);
+        checkbox.closest('tr').classList.remove('selected');
+    }
+    updateBulkDeleteBar();
+}
+
+// Selects every loaded record, not just the rendered ones
+function toggleSelectAll() {
+    const checked = document.getElementById('selectAllCheckbox').checked;
+    salesData.forEach(record => {
+        if (checked) selectedRecords.add(record.id);
+        else selectedRecords.delete(record.id);
+    });
+    renderSales();
+}
+
+function updateBulkDeleteBar() {
+    const bar = document.getElementById('bulkDeleteBar');
+    const countSpan = document.getElementById('selectedCount');
+
+    if (selectedRecords.size > 0) {
+        bar.classList.add('active');
+        countSpan.textContent = selectedRecords.size;
+    } else {
+        bar.classList.remove('active');
+    }
+}
+
+function clearSelection() {
+    selectedRecords.clear();
+    document.getElementById('selectAllCheckbox').checked = false;
+    renderSales();
+}
+
+async function deleteSelected() {
+    if (selectedRecords.size === 0) return;
+
+    if (!confirm(`Are you sure you want to delete ${selectedRecords.size} selected records? This action cannot be undone.`)) {
+        return;
+    }
+
+    try {
+        const response = await fetch('/api/sales/bulk-delete', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({ ids: Array.from(selectedRecords) })
+        });
+
+        const result = await response.json();
+
+        if (result.success) {
+            showAlert(`Successfully deleted ${result.deleted_count} records!`, 'success');
+            selectedRecords.clear();
+            document.getElementById('selectAllCheckbox').checked = false;
+            await syncData();
+        } else {
+            showAlert('Error: ' + result.error, 'error');
+        }
+    } catch (error) {
+        showAlert('Bulk delete failed: ' + error.message, 'error');
+    }
+}
+
+// ==================== END BULK DELETE FUNCTIONS ====================
+
+async function editRecord(id) {
+    const record = salesData.find(s => s.id === id);
+    if (!record) return;
+
+    document.getElementById('editModalId').value = record.id;
+    document.getElementById('editDateTime').value = record.dateTime.slice(0, 16);
+    document.getElementById('editCardNumber').value = record.cardNumber;
+
+    // Validate and populate card types
+    await checkEditCard();
+
+    document.getElementById('editCardType').value = record.cardType;
+    document.getElementById('editMachine').value = record.machine;
+    document.getElementById('editVendor').value = record.vendor;
+    document.getElementById('editModel').value = record.model;
+    document.getElementById('editAmount').value = record.amount;
+    document.getElementById('editType').value = record.type;
+
+    document.getElementById('editModal').style.display = 'block';
+}
+
+function closeEditModal() {
+    document.getElementById('editModal').style.display = 'none';
+}
+
+document.getElementById('editForm').addEventListener('submit', async function(e) {
+    e.preventDefault();
+
+    const id = document.getElementById('editModalId').value;
+    const record = {
+        dateTime: document.getElementById('editDateTime').value,
+        cardNumber: document.getElementById('editCardNumber').value.trim(),
+        cardType: document.getElementById('editCardType').value,
+        machine: document.getElementById('editMachine').value,
+        vendor: document.getElementById('editVendor').value,
+        model: document.getElementById('editModel').value,
+        amount: parseFloat(document.getElementById('editAmount').value),
+        type: document.getElementById('editType').value
+    };
+
+    try {
+        const response = await fetch(`/api/sales/${id}`, {
+            method: 'PUT',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify(record)
+        });
+
+        const result = await response.json();
+
+        if (!result.success) {
+            showAlert(result.error || 'Failed to update', 'error');
+            return;
+        }
+
+        const idx = salesData.findIndex(s => s.id === id);
+        if (idx !== -1) {
+            salesData[idx] = { ...record, id };
+        }
+
+        closeEditModal();
+        renderSales();
+        showAlert('Record updated successfully!', 'success');
+    } catch (error) {
+        showAlert('Update failed: ' + error.message, 'error');
+    }
+});
+
+async function deleteRecord(id) {
+    if (!confirm('Delete this record?')) return;
+    try {
+        await fetch(`/api/sales/${id}`, {method: 'DELETE'});
+        salesData = salesData.filter(r => r.id !== id);
+        selectedRecords.delete(id);
+        renderSales();
+        showAlert('Deleted', 'success');
+    } catch (error) {
+        showAlert('Delete failed', 'error');
+    }
+}
+
+// Record filters run server-side; each change reloads from the first page
+function filterRecords() {
+    const start = document.getElementById('startDate').value;
+    const end = document.getElementById('endDate').value;
+    if (!start || !end) return;
+
+    delete salesFilters.month;
+    salesFilters.startDate = start;
+    salesFilters.endDate = end;
+    loadSales();
+}
+
+function filterRecordsByMonth() {
+    const month = document.getElementById('recordMonthFilter').value;
+    if (!month) return;
+
+    delete salesFilters.startDate;
+    delete salesFilters.endDate;
+    salesFilters.month = month;
+    loadSales();
+}
+
+function clearDateFilter() {
+    document.getElementById('startDate').value = '';
+    document.getElementById('endDate').value = '';
+    document.getElementById('recordMonthFilter').value = '';
+    delete salesFilters.startDate;
+    delete salesFilters.endDate;
+    delete salesFilters.month;
+    loadSales();
+}
+
+function searchRecords() {
+    clearTimeout(searchTimer);
+    searchTimer = setTimeout(() => {
+        salesFilters.q = document.getElementById('searchRecords').value.trim();
+        loadSales();
+    }, 250);
+}
+
+function exportFilters() {
+    return {
+        startDate: document.getElementById('exportStartDate').value,
+        endDate: document.getElementById('exportEndDate').value,
+        month: document.getElementById('exportMonth').value
+    };
+}
+
+// Exports are generated and streamed by the server, then saved as a file
+async function downloadExport(url, filters, filename) {
+    const response = await fetch(url, {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({filters})
+    });
+    if (!response.ok) {
+        const result = await response.json().catch(() => ({}));
+        throw new Error(result.error || response.statusText);
+    }
+    const blob = await response.blob();
+    const href = window.URL.createObjectURL(blob);
+    const a = document.createElement('a');
+    a.href = href;
+    a.download = filename;
+    document.body.appendChild(a);
+    a.click();
+    document.body.removeChild(a);
+    window.URL.revokeObjectURL(href);
+}
+
+async function exportToCSV() {
+    try {
+        await downloadExport('/api/export/csv', exportFilters(), `sales_export_${new Date().toISOString().slice(0,10)}.csv`);
+        showAlert('CSV exported successfully!', 'success');
+    } catch (error) {
+        showAlert('Export failed: ' + error.message, 'error');
+    }
+}
+
+async function exportToExcelFiltered() {
+    try {
+        await downloadExport('/api/export/xlsx', exportFilters(), `sales_export_${new Date().toISOString().split('T')[0]}.xlsx`);
+        showAlert('Excel exported successfully!', 'success');
+    } catch (error) {
+        showAlert('Export failed: ' + error.message, 'error');
+    }
+}
+
+// ==================== CARD USAGE (server-side join) ====================
+
+async function loadInventory() {
+    await applyInventoryFilters(true);
+}
+
+function inventoryQuery() {
+    const params = new URLSearchParams({limit: USAGE_PAGE_SIZE});
+    const filters = {
+        cardNumber: document.getElementById('filterCardNumber').value,
+        cardType: document.getElementById('filterCardType').value,
+        status: document.getElementById('filterStatus').value,
+        vendor: document.getElementById('filterVendor').value,
+        model: document.getElementById('filterModel').value,
+        month: document.getElementById('inventoryMonthFilter').value,
+        q: document.getElementById('searchCards').value.trim()
+    };
+    Object.entries(filters).forEach(([key, value]) => { if (value) params.set(key, value); });
+    if (document.getElementById('showRemainingForModel').checked && filters.model) {
+        params.set('remainingForModel', '1');
+    }
+    return params;
+}
+
+function populateFilters(options) {
+    populateSelect('filterCardNumber', options.cardNumbers);
+    populateSelect('filterCardType', options.cardTypes);
+    populateSelect('filterVendor', options.vendors);
+    populateSelect('filterModel', options.models);
+}
+
+function populateSelect(id, values) {
+    const select = document.getElementById(id);
+    const current = select.value;
+    while (select.options.length > 1) select.remove(1);
+    values.forEach(val => {
+        const opt = document.createElement('option');
+        opt.value = val;
+        opt.textContent = val;
+        select.appendChild(opt);
+    });
+    select.value = values.includes(current) ? current : '';
+}
+
+// Filters run server-side; each change reloads from the first page
+async function applyInventoryFilters(withOptions = false) {
+    usageGeneration++;
+    comparisonData = [];
+    usageCursor = null;
+    usageLoading = false;
+    inventoryView.reset();
+    await loadMoreInventory(true, withOptions === true);
+}
+
+async function loadMoreInventory(first = false, withOptions = false) {
+    if (usageLoading || (!first && !usageCursor)) return;
+    const generation = usageGeneration;
+    usageLoading = true;
+    try {
+        const params = inventoryQuery();
+        if (usageCursor) params.set('cursor', usageCursor);
+        if (withOptions) params.set('options', '1');
+        const response = await fetch('/api/inventory/usage?' + params);
+        const result = await response.json();
+        if (generation !== usageGeneration) return;
+        if (!result.success) throw new Error(result.error);
+
+        usageCursor = result.next_cursor;
+        comparisonData.push(...result.data);
+        if (result.options) populateFilters(result.options);
+        if (result.stats) updateInventoryStats(result.stats);
+        inventoryView.render();
+    } catch (error) {
+        showAlert('Failed to load inventory: ' + error.message, 'error');
+    } finally {
+        if (generation === usageGeneration) usageLoading = false;
+    }
+}
+
+// Display text of a usage row, formatted the first time the row is shown
+function inventoryCells(item) {
+    if (!item.cells) {
+        item.cells = [
+            item.cardNumber,
+            item.cardType,
+            item.status,
+            item.dateTime != null ? new Date(item.dateTime).toLocaleString() : '-',
+            item.vendor ?? '-',
+            item.model ?? '-',
+            item.amount != null ? '₹' + item.amount.toLocaleString() : '-'
+        ];
+    }
+    return item.cells;
+}
+
+// Rows of the same card follow each other; the first one opens the group
+function renderInventoryRow(row, item, index) {
+    if (!row.cells.length) {
+        row.innerHTML = '<td></td><td><span class="inventory-tag"></span></td><td><span class="card-status"></span></td><td></td><td></td><td></td><td></td>';
+    }
+    const grouped = index > 0 && comparisonData[index - 1].cardNumber === item.cardNumber;
+    row.className = grouped ? 'transaction-row' : 'card-group-start';
+
+    const cells = inventoryCells(item);
+    for (let i = 0; i < cells.length; i++) {
+        const cell = row.cells[i].firstElementChild || row.cells[i];
+        if (cell.textContent !== cells[i]) cell.textContent = cells[i];
+    }
+    row.cells[2].firstElementChild.className = 'card-status ' + (item.status === 'Used' ? 'status-used' : 'status-available');
+}
+
+function clearInventoryFilters() {
+    ['filterCardNumber', 'filterCardType', 'filterStatus', 'filterVendor', 'filterModel'].forEach(id => {
+        document.getElementById(id).value = '';
+    });
+    document.getElementById('showRemainingForModel').checked = false;
+    document.getElementById('remainingStats').style.display = 'none';
+    document.getElementById('inventoryMonthFilter').value = '';
+    applyInventoryFilters();
+}
+
+function clearInventoryMonthFilter() {
+    document.getElementById('inventoryMonthFilter').value = '';
+    applyInventoryFilters();
+}
+
+function searchInventoryTable() {
+    clearTimeout(inventorySearchTimer);
+    inventorySearchTimer = setTimeout(applyInventoryFilters, 250);
+}
+
+function updateInventoryStats(stats) {
+    document.getElementById('cardStats').innerHTML = `
+        <div class="stat-card"><h3>Total Cards</h3><div class="stat-number">${stats.total}</div></div>
+        <div class="stat-card"><h3>Used</h3><div class="stat-number">${stats.used}</div></div>
+        <div class="stat-card"><h3>Available</h3><div class="stat-number">${stats.available}</div></div>
+        <div class="stat-card"><h3>Transactions</h3><div class="stat-number">${stats.transactions}</div></div>
+    `;
+
+    const remainingStats = document.getElementById('remainingStats');
+    if (stats.remaining) {
+        const {eligible, remaining} = stats.remaining;
+        const pct = eligible > 0 ? Math.round((remaining / eligible) * 100) : 0;
+        remainingStats.style.display = 'block';
+        remainingStats.innerHTML = `<strong>📊 Remaining:</strong> ${remaining} of ${eligible} cards available (${pct}%)`;
+    } else {
+        remainingStats.style.display = 'none';
+    }
+}
+
+async function loadReports() {
+    const params = new URLSearchParams();
+    const start = document.getElementById('reportStartDate').value;
+    const end = document.getElementById('reportEndDate').value;
+    if (start) params.set('startDate', start);
+    if (end) params.set('endDate', end);
+
+    let report, months;
+    try {
+        const [summaryRes, monthlyRes] = await Promise.all([
+            fetch('/api/reports/summary?' + params),
+            fetch('/api/reports/monthly?' + params)
+        ]);
+        const summary = await summaryRes.json();
+        const monthly = await monthlyRes.json();
+        if (!summary.success) throw new Error(summary.error);
+        if (!monthly.success) throw new Error(monthly.error);
+        report = summary.data;
+        months = monthly.data.map(m => ({key: m.month, count: m.count, amount: m.amount}));
+    } catch (error) {
+        showAlert('Failed to load reports: ' + error.message, 'error');
+        return;
+    }
+
+    document.getElementById('reportStats').innerHTML = `
+        <div class="stat-card"><h3>Total Sales</h3><div class="stat-number">₹${report.total.amount.toLocaleString()}</div></div>
+        <div class="stat-card"><h3>Transactions</h3><div class="stat-number">${report.total.count}</div></div>
+    `;
+
+    const sections = [
+        ['By Month', 'Month', months],
+        ['By Card Type', 'Type', report.byCardType],
+        ['By Vendor', 'Vendor', report.byVendor],
+        ['By Model', 'Model', report.byModel],
+        ['By Machine', 'Machine', report.byMachine]
+    ];
+    let html = '';
+    sections.forEach(([title, label, entries]) => {
+        html += `<h3 style="margin-top: 30px;">${title}</h3><table><tr><th>${label}</th><th>Transactions</th><th>Amount</th></tr>`;
+        entries.forEach(e => {
+            html += `<tr><td>${e.key}</td><td>${e.count}</td><td>₹${e.amount.toLocaleString()}</td></tr>`;
+        });
+        html += '</table>';
+    });
+
+    document.getElementById('reportTables').innerHTML = html;
+}
+
+function clearReportDates() {
+    document.getElementById('reportStartDate').value = '';
+    document.getElementById('reportEndDate').value = '';
+    loadReports();
+}
+
+async function exportToExcel() {
+    try {
+        await downloadExport('/api/export/xlsx', {}, `sales_${new Date().toISOString().split('T')[0]}.xlsx`);
+    } catch (error) {
+        showAlert('Export failed: ' + error.message, 'error');
+    }
+}
+
+window.onclick = function(event) {
+    const modal = document.getElementById('editModal');
+    if (event.target == modal) {
+        modal.style.display = 'none';
+    }
+}
@@ -0,0 +1,244 @@
+let masterData = {
+    cards: [],
+    machines: [],
+    vendors: [],
+    models: []
+};
+
+document.addEventListener('DOMContentLoaded', function() {
+    loadMasterData();
+});
+
+async function loadMasterData() {
+    try {
+        const response = await fetch('/api/master-data');
+        const result = await response.json();
+        masterData = result.data;
+        renderAll();
+        updateStats();
+    } catch (error) {
+        showAlert('Failed to load master data: ' + error.message, 'error');
+    }
+}
+
+function renderAll() {
+    renderCards();
+    renderMachines();
+    renderVendors();
+    renderModels();
+}
+
+function updateStats() {
+    document.getElementById('statCards').textContent = masterData.cards.length;
+    document.getElementById('statMachines').textContent = masterData.machines.length;
+    document.getElementById('statVendors').textContent = masterData.vendors.length;
+    document.getElementById('statModels').textContent = masterData.models.length;
+}
+
+function renderCards() {
+    const container = document.getElementById('cardsList');
+    container.innerHTML = '';
+
+    masterData.cards.forEach((card, index) => {
+        const div = document.createElement('div');
+        div.className = 'item';
+        div.innerHTML = `
+            <div>
+                <div class="item-info">${card.number}</div>
+                <div class="item-sub">${card.type}</div>
+            </div>
+            <div class="item-actions">
+                <button class="btn btn-danger btn-small" onclick="deleteCard(${index})">Delete</button>
+            </div>
+        `;
+        container.appendChild(div);
+    });
+}
+
+function renderMachines() {
+    const container = document.getElementById('machinesList');
+    container.innerHTML = '';
+
+    masterData.machines.forEach((machine, index) => {
+        const div = document.createElement('div');
+        div.className = 'item';
+        div.innerHTML = `
+            <div class="item-info">${machine}</div>
+            <div class="item-actions">
+                <button class="btn btn-danger btn-small" onclick="deleteMachine(${index})">Delete</button>
+            </div>
+        `;
+        container.appendChild(div);
+    });
+}
+
+function renderVendors() {
+    const container = document.getElementById('vendorsList');
+    container.innerHTML = '';
+
+    masterData.vendors.forEach((vendor, index) => {
+        const div = document.createElement('div');
+        div.className = 'item';
+        div.innerHTML = `
+            <div class="item-info">${vendor}</div>
+            <div class="item-actions">
+                <button class="btn btn-danger btn-small" onclick="deleteVendor(${index})">Delete</button>
+            </div>
+        `;
+        container.appendChild(div);
+    });
+}
+
+function renderModels() {
+    const container = document.getElementById('modelsList');
+    container.innerHTML = '';
+
+    masterData.models.forEach((model, index) => {
+        const div = document.createElement('div');
+        div.className = 'item';
+        div.innerHTML = `
+            <div class="item-info">${model}</div>
+            <div class="item-actions">
+                <button class="btn btn-danger btn-small" onclick="deleteModel(${index})">Delete</button>
+            </div>
+        `;
+        container.appendChild(div);
+    });
+}
+
+function addCard() {
+    const number = document.getElementById('newCardNumber').value.trim();
+    const type = document.getElementById('newCardType').value;
+
+    if (!number || !type) {
+        showAlert('Please enter both card number and type', 'error');
+        return;
+    }
+
+    // No duplicate check - allow same number with same type
+    masterData.cards.push({ number, type });
+    masterData.cards.sort((a, b) => {
+        if (a.number !== b.number) return a.number.localeCompare(b.number);
+        return a.type.localeCompare(b.type);
+    });
+
+    document.getElementById('newCardNumber').value = '';
+    document.getElementById('newCardType').value = '';
+
+    renderCards();
+    updateStats();
+    showAlert('Card added! Click "Save All Changes" to persist.', 'success');
+}
+
+function addMachine() {
+    const name = document.getElementById('newMachine').value.trim();
+    if (!name) return;
+
+    if (masterData.machines.includes(name)) {
+        showAlert('Machine already exists', 'error');
+        return;
+    }
+
+    masterData.machines.push(name);
+    masterData.machines.sort();
+
+    document.getElementById('newMachine').value = '';
+    renderMachines();
+    updateStats();
+    showAlert('Machine added! Click "Save All Changes" to persist.', 'success');
+}
+
+function addVendor() {
+    const name = document.getElementById('newVendor').value.trim();
+    if (!name) return;
+
+    if (masterData.vendors.includes(name)) {
+        showAlert('Vendor already exists', 'error');
+        return;
+    }
+
+    masterData.vendors.push(name);
+    masterData.vendors.sort();
+
+    document.getElementById('newVendor').value = '';
+    renderVendors();
+    updateStats();
+    showAlert('Vendor added! Click "Save All Changes" to persist.', 'success');
+}
+
+function addModel() {
+    const name = document.getElementById('newModel').value.trim();
+    if (!name) return;
+
+    if (masterData.models.includes(name)) {
+        showAlert('Model already exists', 'error');
+        return;
+    }
+
+    masterData.models.push(name);
+    masterData.models.sort();
+
+    document.getElementById('newModel').value = '';
+    renderModels();
+    updateStats();
+    showAlert('Model added! Click "Save All Changes" to persist.', 'success');
+}
+
+function deleteCard(index) {
+    if (!confirm('Delete this card?')) return;
+    masterData.cards.splice(index, 1);
+    renderCards();
+    updateStats();
+    showAlert('Card deleted! Click "Save All Changes" to persist.', 'success');
+}
+
+function deleteMachine(index) {
+    if (!confirm('Delete this machine?')) return;
+    masterData.machines.splice(index, 1);
+    renderMachines();
+    updateStats();
+    showAlert('Machine deleted! Click "Save All Changes" to persist.', 'success');
+}
+
+function deleteVendor(index) {
+    if (!confirm('Delete this vendor?')) return;
+    masterData.vendors.splice(index, 1);
+    renderVendors();
+    updateStats();
+    showAlert('Vendor deleted! Click "Save All Changes" to persist.', 'success');
+}
+
+function deleteModel(index) {
+    if (!confirm('Delete this model?')) return;
+    masterData.models.splice(index, 1);
+    renderModels();
+    updateStats();
+    showAlert('Model deleted! Click "Save All Changes" to persist.', 'success');
+}
+
+async function saveAllData() {
+    try {
+        const response = await fetch('/api/master-data', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify(masterData)
+        });
+
+        const result = await response.json();
+        if (result.success) {
+            showAlert('All changes saved successfully! Redirecting...', 'success');
+            setTimeout(() => window.location.href = '/', 1500);
+        } else {
+            showAlert('Error saving data: ' + result.error, 'error');
+        }
+    } catch (error) {
+        showAlert('Save failed: ' + error.message, 'error');
+    }
+}
+
+function showAlert(message, type) {
+    const alert = document.getElementById('alertBox');
+    alert.textContent = message;
+    alert.className = 'alert alert-' + type;
+    setTimeout(() => alert.className = 'alert', 5000);
+}